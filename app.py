@@ -6,10 +6,29 @@ import numpy as np
 import matplotlib.pyplot as plt
 import plotly.express as px
 from datetime import datetime
+import os
+import price_store
+import backup_manager
+from monte_carlo import simulate
+from risk_engine import BENCHMARKS, rolling_risk, risk_summary
+from cash_ledger import (build_cash_ledger, cash_balances, dividend_summary, money_weighted_returns, security_flows,
+                         withholding_by_currency)
+import fundamentals_store
+from fundamentals_store import eps_cagr
+from live_quotes import FX_TICKERS, LiveValuation, QuoteStreamer, ReplayFeed, YahooFeed
+from perf_cache import update_performance
+from what_if import PortfolioState, rebalance, what_if
+from schema import ensure_perf_tables, ensure_symbols_table
+from symbol_index import asset_class_of, currency_of, load_symbols, refresh_symbols, sector_of
 
 
 st.set_page_config(page_title="Wealth Dashboard", layout="wide") 
 DB_NAME = "portfolio.db"
+BACKUP_INTERVAL_HOURS = float(os.environ.get("BACKUP_INTERVAL_HOURS", 0))
+LIVE_FEED = os.environ.get("LIVE_FEED", "yahoo")  # "yahoo" or path to a ticker,price replay CSV
+LIVE_REFRESH_SECONDS = 2
+SCREENER_UNIVERSE = os.environ.get("SCREENER_UNIVERSE", "")  # optional file, one ticker per line
+CURRENCY_SYMBOLS = {"USD": "$", "THB": "฿"}
 
 
 def get_db_connection():
@@ -51,6 +70,9 @@ def get_db_connection():
     except Exception as e:
         st.error(f"Error checking/inserting data: {e}")
 
+    ensure_symbols_table(conn)
+    ensure_perf_tables(conn)
+
     return conn
 
 
@@ -81,24 +103,14 @@ def get_current_fx_rate():
     except:
         return 34.0
     
-@st.cache_data(ttl=3600*24)
-def get_stock_sector(ticker):
-    if ticker in ["THB", "USD"]: return "Cash & Equiv."
-    
-    if ticker.endswith("-USD"): return "Crypto"
-    
+def get_symbol_meta(tickers):
+    # sector / quote type / currency come from the symbols table; Yahoo is only
+    # asked about symbols that are missing or older than a week
     try:
-        stock = yf.Ticker(ticker)
-        sector = stock.info.get('sector', 'Others')
-       
-        if sector == "Others":
-            quote_type = stock.info.get('quoteType', '')
-            if quote_type == 'ETF':
-                return "ETF / Fund"
-                
-        return sector
-    except:
-        return "Others"
+        refresh_symbols(conn, tickers)
+    except Exception as e:
+        st.warning(f"Could not refresh symbol metadata: {e}")
+    return load_symbols(conn, tickers)
     
 WATCHLIST_TICKERS = [
     "BTC-USD", "ETH-USD", "SOL-USD", "DOGE-USD", 
@@ -110,7 +122,8 @@ WATCHLIST_TICKERS = [
 @st.cache_data(ttl=3600*24) 
 def get_correlation_matrix(tickers):
     try:
-        data = yf.download(tickers, period="2mo", progress=False)['Close']
+        start_date = pd.Timestamp.today().normalize() - pd.DateOffset(months=2)
+        data = get_price_history(tuple(tickers), start_date)
         
         returns = data.pct_change()
         
@@ -132,6 +145,7 @@ def get_market_movers():
     ]
     
     data = []
+    symbols = get_symbol_meta(tickers)
     
     for t in tickers:
         try:
@@ -144,7 +158,7 @@ def get_market_movers():
                 change = curr_price - prev_close
                 pct_change = (change / prev_close) * 100
                 
-                asset_type = "Crypto" if "-USD" in t else "Stock 🇺🇸"
+                asset_type = "Crypto" if asset_class_of(symbols, t) == "Crypto" else "Stock 🇺🇸"
                 
                 data.append({
                     "Ticker": t,
@@ -163,18 +177,6 @@ def get_market_movers():
         
     return df
 
-def classify_asset(ticker, platform):
-    if platform in ["Binance"]: 
-        return "Crypto"
-    
-    if ticker.endswith("-USD"): 
-        return "Crypto"
-        
-    if ticker in ["THB", "USD"]: 
-        return "Cash "
-        
-    return "Stock"
-
 def calculate_max_drawdown(cumulative_returns):
     peak = cumulative_returns.cummax()
     drawdown = (cumulative_returns - peak) / peak
@@ -189,24 +191,19 @@ def get_real_peg(ticker, current_pe):
         financials = stock.financials 
         
         if financials.empty:
-            return None
+            return None, None
 
         if 'Diluted EPS' in financials.index:
             eps_row = financials.loc['Diluted EPS']
         elif 'Basic EPS' in financials.index:
             eps_row = financials.loc['Basic EPS']
         else:
-            return None
+            return None, None
         
-        latest_eps = eps_row.iloc[0]
-        oldest_eps = eps_row.iloc[-1]
-        years_diff = len(eps_row) - 1 
+        growth_rate = eps_cagr(eps_row.astype(float).to_numpy())[0]
         
-        if years_diff < 1 or oldest_eps <= 0 or latest_eps <= 0:
-            return None 
-
-        cagr = ( (latest_eps / oldest_eps) ** (1 / years_diff) ) - 1
-        growth_rate = cagr * 100 
+        if np.isnan(growth_rate):
+            return None, None
         
         if growth_rate > 0:
             real_peg = current_pe / growth_rate
@@ -217,40 +214,15 @@ def get_real_peg(ticker, current_pe):
     except Exception as e:
         return None, None
 
-@st.cache_data(ttl=3600*12)
-def get_performance_chart(transactions_df):
-    if transactions_df.empty:
-        return pd.DataFrame()
+def get_price_history(symbols, start_date):
+    # closes are shared between worker processes through the memory-mapped
+    # price store instead of being copied into every process's st.cache_data
+    store = price_store.load()
+    if price_store.is_fresh(store, symbols, start_date):
+        return store.frame(symbols, start=start_date)
 
-    start_date = pd.to_datetime(transactions_df['date']).min()
-    end_date = datetime.today()
-    all_dates = pd.date_range(start=start_date, end=end_date)
-    
-    tickers = transactions_df['ticker'].unique()
-    daily_qty = pd.DataFrame(0.0, index=all_dates, columns=tickers)
-    daily_flows = pd.Series(0.0, index=all_dates) 
-    
-    sorted_tx = transactions_df.sort_values('date')
-    for idx, row in sorted_tx.iterrows():
-        d = pd.to_datetime(row['date'])
-        t = row['ticker']
-        q = row['quantity']
-        
-        if row['type'] == 'BUY':
-            cost = (q * row['price']) + row['fee']
-            if d in daily_qty.index:
-                daily_qty.loc[d:, t] += q
-                daily_flows.loc[d] += cost
-                
-        elif row['type'] == 'SELL':
-            proceeds = (q * row['price']) - row['fee'] 
-            if d in daily_qty.index:
-                daily_qty.loc[d:, t] -= q
-                daily_flows.loc[d] -= proceeds 
-
-    all_symbols = list(tickers) + ['^GSPC']
     try:
-        data = yf.download(all_symbols, start=start_date, progress=False)
+        data = yf.download(list(symbols), start=start_date, progress=False)
         
         if isinstance(data.columns, pd.MultiIndex):
             price_data = data['Close']
@@ -259,43 +231,85 @@ def get_performance_chart(transactions_df):
 
         if price_data.index.tz is not None:
             price_data.index = price_data.index.tz_localize(None)
-            
-        price_data = price_data.reindex(all_dates).fillna(method='ffill')
-        
+
+        if isinstance(price_data, pd.Series):
+            price_data = price_data.to_frame(symbols[0])
+
+        try:
+            price_store.publish(price_data, start=start_date)
+        except OSError:
+            pass
+        return price_data
     except Exception as e:
         return pd.DataFrame()
 
-    portfolio_val = pd.Series(0.0, index=all_dates)
-    for t in tickers:
-        if t in price_data.columns:
-            portfolio_val += daily_qty[t] * price_data[t]
-            
-    daily_returns = pd.Series(0.0, index=all_dates)
+def get_performance_symbols(transactions_df):
+    start_date = pd.to_datetime(transactions_df['date']).min()
+    trades = transactions_df[transactions_df['type'].isin(['BUY', 'SELL'])]
+    tickers = list(trades['ticker'].unique())
+    return start_date, tickers, tuple(dict.fromkeys(tickers + list(BENCHMARKS.values())))
+
+@st.cache_data(ttl=3600*12)
+def get_performance_chart(transactions_df):
+    if transactions_df.empty:
+        return pd.DataFrame()
+
+    start_date, _, _ = get_performance_symbols(transactions_df)
+    end_date = datetime.today()
+    all_dates = pd.date_range(start=start_date, end=end_date)
     
-    for i in range(1, len(all_dates)):
-        today = all_dates[i]
-        yesterday = all_dates[i-1]
-        
-        val_today = portfolio_val.loc[today]
-        val_yesterday = portfolio_val.loc[yesterday]
-        flow_today = daily_flows.loc[today]
-        
-        if val_yesterday > 0:
-            ret = (val_today - flow_today) / val_yesterday - 1
-            daily_returns.loc[today] = ret
+    # positions/values/returns are persisted in perf_series; only the days
+    # from the earliest changed transaction (and new market days) are rebuilt,
+    # and only their closes are fetched
+    series = update_performance(conn, transactions_df,
+                                lambda symbols, start: get_price_history(tuple(symbols), start), end_date)
+    if series.empty:
+        return pd.DataFrame()
+    my_port_cum = series['cum_index'].reindex(all_dates).ffill().fillna(100.0)
 
-    my_port_cum = (1 + daily_returns).cumprod() * 100
+    price_data = get_price_history(tuple(BENCHMARKS.values()), start_date)
+    price_data = price_data.reindex(all_dates).ffill()
     
-    if '^GSPC' in price_data.columns:
-        sp500_ret = price_data['^GSPC'].pct_change().fillna(0)
-        sp500_cum = (1 + sp500_ret).cumprod() * 100
-    else:
-        sp500_cum = pd.Series(100, index=all_dates) 
+    result = {'My Portfolio': my_port_cum}
+    for name, symbol in BENCHMARKS.items():
+        if symbol in price_data.columns:
+            bench_ret = price_data[symbol].pct_change().fillna(0)
+            result[name] = (1 + bench_ret).cumprod() * 100
+        else:
+            result[name] = pd.Series(100.0, index=all_dates)
+
+    return pd.DataFrame(result)
+
+def get_risk_returns(transactions_df, perf_df):
+    # daily returns on trading days for the portfolio, each holding and the benchmarks
+    start_date, tickers, all_symbols = get_performance_symbols(transactions_df)
+    prices = get_price_history(all_symbols, start_date)
+    held = [t for t in tickers if t in prices.columns]
+
+    levels = perf_df.join(prices[held].reindex(perf_df.index).ffill())
+    levels = levels[levels.index.dayofweek < 5]
+    returns = levels.pct_change().iloc[1:]
+
+    asset_returns = returns[['My Portfolio'] + held]
+    bench_returns = returns[list(BENCHMARKS.keys())]
+    return asset_returns, bench_returns
+
+def get_projection_returns(tickers, lookback_years):
+    # daily returns in THB, so FX moves are simulated together with the assets
+    start_date = pd.Timestamp.today().normalize() - pd.DateOffset(years=lookback_years)
+    prices = get_price_history(tuple(list(tickers) + ['USDTHB=X']), start_date)
+    if prices.empty:
+        return pd.DataFrame(), []
+    prices = prices[prices.index.dayofweek < 5].ffill()
 
-    return pd.DataFrame({
-        'My Portfolio': my_port_cum,
-        'S&P 500': sp500_cum
-    })
+    held = [t for t in tickers if t in prices.columns]
+    prices_thb = prices[held].copy()
+    symbols = get_symbol_meta(held)
+    usd = [t for t in held if currency_of(symbols, t) == 'USD']
+    if usd and 'USDTHB=X' in prices.columns:
+        prices_thb[usd] = prices_thb[usd].mul(prices['USDTHB=X'], axis=0)
+
+    return prices_thb.pct_change().iloc[1:], held
 
 
     
@@ -359,9 +373,78 @@ def calculate_portfolio(df):
     
     return holdings, 0, 0, 0, total_realized_pnl
 
+@st.cache_data(ttl=300)
+def get_last_price(ticker):
+    try:
+        history = yf.Ticker(ticker).history(period="1d")
+        return float(history['Close'].iloc[-1]) if not history.empty else 0.0
+    except:
+        return 0.0
+
+def build_what_if_state(holdings_df, symbol_meta, fx_rate, extra_tickers=()):
+    # hypothetical trades run on the dashboard's holdings and prices; nothing touches the DB
+    fx = {t: 1.0 if currency_of(symbol_meta, t) == "THB" else fx_rate for t in holdings_df['ticker']}
+    state = PortfolioState.from_holdings(holdings_df, fx)
+
+    new = [t for t in extra_tickers if t not in state.index]
+    if new:
+        meta = get_symbol_meta(new)
+        state = state.with_assets(
+            new,
+            {t: get_last_price(t) for t in new},
+            {t: 1.0 if currency_of(meta, t) == "THB" else fx_rate for t in new},
+            {t: sector_of(meta, t) for t in new})
+    return state
+
+def start_live_stream(holdings_df, currencies, fx_rate):
+    if LIVE_FEED == "yahoo":
+        feed = YahooFeed(list(holdings_df['ticker']) + list(FX_TICKERS))
+    else:
+        feed = ReplayFeed(LIVE_FEED, rate=1000, loop=True)
+
+    live_holdings = holdings_df.assign(cost_thb=holdings_df['cost_amount'] * fx_rate)
+    prices = dict(zip(holdings_df['ticker'], holdings_df['Current Price']))
+    valuation = LiveValuation(live_holdings, prices, {'USD': fx_rate}, currencies)
+    return QuoteStreamer(feed, valuation).start()
+
+def stop_live_stream():
+    streamer = st.session_state.pop('live_stream', None)
+    if streamer is not None:
+        streamer.stop()
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def render_live_quotes():
+    # ticks are applied on the streamer thread; the UI only samples them here
+    streamer = st.session_state.get('live_stream')
+    if streamer is None:
+        return
+    if streamer.expired:
+        # the lease ran out while this session was away; the full rerun restarts it
+        st.rerun()
+
+    live_table, summary = streamer.snapshot()
+    l1, l2, l3 = st.columns(3)
+    l1.metric("Live Value", f"฿{summary['total_value']:,.0f}")
+    l2.metric("Live Unrealized P/L", f"฿{summary['unrealized_pnl']:,.0f}")
+    l3.metric("Ticks Received", f"{summary['ticks']:,}")
+
+    st.dataframe(
+        live_table,
+        use_container_width=True,
+        column_config={
+            "Price": st.column_config.NumberColumn(format="%.2f"),
+            "Market Value": st.column_config.NumberColumn(format="฿%.0f"),
+            "Unrealized P/L": st.column_config.NumberColumn(format="฿%.0f"),
+            "Allocation %": st.column_config.NumberColumn(format="%.2f%%"),
+        },
+        hide_index=True
+    )
+    if streamer.error:
+        st.warning(f"Live feed stopped: {streamer.error}")
+
 with st.sidebar:
     st.header("New Transaction")
-    tx_type = st.radio("Type", ["BUY", "SELL"])
+    tx_type = st.radio("Type", ["BUY", "SELL", "DEPOSIT", "WITHDRAW", "DIVIDEND"])
     live_fx = get_current_fx_rate()
 
     with st.form("transaction_form", clear_on_submit=True):
@@ -421,15 +504,20 @@ with st.sidebar:
         elif tx_type == "DIVIDEND":
             platform = st.selectbox("Platform", ["Dime", "Binance"])
             ticker = st.text_input("Ticker", placeholder="MSFT").upper()
-            price = st.number_input("Net Payout ($)", min_value=0.0)
-            wht = st.number_input("WHT ($)", min_value=0.0)
+            st.caption("Amounts in the stock's trading currency (THB for .BK, USD otherwise)")
+            price = st.number_input("Net Payout", min_value=0.0)
+            wht = st.number_input("WHT", min_value=0.0)
             qty = 1.0
 
         submitted = st.form_submit_button(f"Save {tx_type}")
         if submitted:
-            if tx_type in ["BUY", "SELL"] and not ticker:
+            if tx_type in ["BUY", "SELL", "DIVIDEND"] and not ticker:
                  st.error("Ticker Required!")
             else:
+                 if tx_type == "DIVIDEND":
+                    # paid in the holding's own currency, not the form's USD default
+                    currency = currency_of(get_symbol_meta([ticker]), ticker)
+                    fx_rate = 1.0 if currency == "THB" else live_fx
                  try:
                     sql = '''INSERT INTO transactions (date, type, platform, ticker, quantity, price, fee, currency, fx_rate, wht, notes) VALUES (?,?,?,?,?,?,?,?,?,?,?)'''
                     run_query(sql, (tx_date, tx_type, platform, ticker, qty, price, fee, currency, fx_rate, wht, notes))
@@ -441,7 +529,7 @@ with st.sidebar:
 
 raw_df = load_data()
 
-tab1,tab2 ,tab3, tab4 = st.tabs(["Dashboard", "Market Movers", "Performance Chart", "Transactions"])
+tab1,tab2 ,tab3, tab4, tab5, tab6, tab7 = st.tabs(["Dashboard", "Market Movers", "Performance Chart", "Transactions", "Projection", "Screener", "What-If"])
 
 with tab1:
     if raw_df.empty:
@@ -461,13 +549,15 @@ with tab1:
             pe_ratios = []
             peg_ratios = []
             recommendations = []
+
+            symbol_meta = get_symbol_meta(list(raw_df['ticker'].dropna().unique()))
             
             for index, row in holdings_df.iterrows():
                 ticker = row['ticker']
                 qty = row['quantity']
                 cost_basis = row['cost_amount']
                 
-                this_sector = get_stock_sector(ticker)
+                this_sector = sector_of(symbol_meta, ticker)
                 
                 current_price = 0
                 pe = "N/A"
@@ -507,7 +597,7 @@ with tab1:
                 except:
                     current_price = 0
                 
-                if ticker.endswith("-USD") or not ticker.endswith(".BK"): 
+                if currency_of(symbol_meta, ticker) != "THB": 
                      price_in_thb = current_price * live_fx
                 else:
                      price_in_thb = current_price
@@ -554,6 +644,31 @@ with tab1:
             
             st.divider()
 
+            st.subheader("Cash & Money-Weighted Return")
+            currencies = {t: currency_of(symbol_meta, t) for t in raw_df['ticker'].dropna().unique()}
+            ledger = build_cash_ledger(raw_df, default_fx=live_fx, currencies=currencies)
+            trade_flows = security_flows(ledger)
+            ticker_xirr = money_weighted_returns(trade_flows, 'ticker', holdings_df.set_index('ticker')['Market Value'])
+            holdings_df['XIRR'] = holdings_df['ticker'].map(ticker_xirr) * 100
+            port_xirr = money_weighted_returns(trade_flows.assign(scope='All'), 'scope', pd.Series({'All': total_value}))
+            port_xirr = port_xirr.get('All', np.nan) * 100
+            divs = dividend_summary(ledger)
+
+            x1, x2, x3 = st.columns(3)
+            x1.metric("XIRR (Money-Weighted)", f"{port_xirr:.2f}%" if pd.notna(port_xirr) else "N/A",
+                      help="Annualized return including the timing of every buy, sell and dividend.")
+            x2.metric("Dividends (Net)", f"฿{divs['net_thb'].sum() if not divs.empty else 0:,.0f}")
+            wht_by_currency = withholding_by_currency(ledger)
+            x3.metric("Withholding Tax", " / ".join(f"{CURRENCY_SYMBOLS.get(c, c + ' ')}{v:,.2f}"
+                                                    for c, v in wht_by_currency.items()) or "0.00")
+
+            balances = cash_balances(ledger)
+            if not balances.empty:
+                st.caption("Cash Balance by Platform")
+                st.dataframe(balances, use_container_width=True)
+
+            st.divider()
+
             st.subheader("Asset Allocation")
             c1, c2 = st.columns(2)
             with c1:
@@ -576,6 +691,22 @@ with tab1:
 
             st.divider()
 
+            st.subheader("Live Quotes")
+            if st.toggle("Stream live prices", help="Updates value, P/L and allocation tick by tick"):
+                live_key = tuple(zip(holdings_df['ticker'], holdings_df['quantity']))
+                current = st.session_state.get('live_stream')
+                if st.session_state.get('live_key') != live_key or current is None or current.expired:
+                    stop_live_stream()
+                    live_currencies = {t: currency_of(symbol_meta, t) for t in holdings_df['ticker']}
+                    st.session_state['live_stream'] = start_live_stream(holdings_df, live_currencies, live_fx)
+                    st.session_state['live_key'] = live_key
+                render_live_quotes()
+            else:
+                stop_live_stream()
+                st.session_state.pop('live_key', None)
+
+            st.divider()
+
             st.subheader("Current Holdings")
             
             for index, row in holdings_df.iterrows():
@@ -594,6 +725,8 @@ with tab1:
                      c1.metric("Qty", f"{row['quantity']:,.4f}")
                      c2.metric("Avg Cost ($)", f"${row['cost_amount']/row['quantity']:,.2f}")
                      c3.metric("P/L (THB)", f"฿{row['Unrealized P/L']:,.0f}", delta=f"{row['% P/L']:.2f}%")
+                     if pd.notna(row['XIRR']):
+                         st.caption(f"Money-weighted return (XIRR): {row['XIRR']:.2f}% p.a.")
                      
                      st.divider()
                      
@@ -742,7 +875,9 @@ with tab3:
             perf_df = get_performance_chart(raw_df)
         
         if not perf_df.empty:
-            st.line_chart(perf_df, color=["#00FF00", "#FF4B4B"]) 
+            bench_names = st.multiselect("Benchmarks", list(BENCHMARKS.keys()), default=["S&P 500"])
+            chart_cols = ['My Portfolio'] + bench_names
+            st.line_chart(perf_df[chart_cols], color=["#00FF00", "#FF4B4B", "#1F77B4", "#FFA500", "#9467BD"][:len(chart_cols)]) 
             
             total_return = perf_df['My Portfolio'].iloc[-1] - 100
             market_return = perf_df['S&P 500'].iloc[-1] - 100
@@ -779,6 +914,43 @@ with tab3:
             else:
                 st.warning(f"Caution: Your portfolio has higher drawdown than the market ({my_mdd:.2f}%)")
 
+            st.divider()
+
+            st.markdown("#### Risk Analytics")
+            st.caption("Annualized from daily returns on trading days. Alpha is Jensen's alpha vs each benchmark.")
+
+            # same benchmark selection as the chart above; none selected means no pair metrics
+            asset_returns, bench_returns = get_risk_returns(raw_df, perf_df)
+            bench_returns = bench_returns[bench_names]
+
+            rc1, rc2 = st.columns(2)
+            with rc1:
+                window = st.select_slider("Rolling Window (trading days)", options=[21, 63, 126, 252], value=63)
+            with rc2:
+                risk_free = st.number_input("Risk-Free Rate (%)", value=0.0, step=0.25) / 100
+
+            per_asset, per_pair = risk_summary(asset_returns, bench_returns, risk_free=risk_free)
+            if not per_asset.empty:
+                st.dataframe(per_asset.style.format("{:.2f}"), use_container_width=True)
+                if bench_names:
+                    st.dataframe(per_pair.style.format("{:.2f}"), use_container_width=True)
+
+            rolling = rolling_risk(asset_returns, bench_returns, window=window, risk_free=risk_free)
+            metric_labels = {
+                "Volatility %": "volatility",
+                "Sharpe": "sharpe",
+                "Sortino": "sortino",
+                "Max Drawdown %": "max_drawdown",
+            }
+            if bench_names:
+                metric_labels.update({"Beta": "beta", "Alpha %": "alpha", "Tracking Error %": "tracking_error"})
+            metric_label = st.selectbox("Rolling Metric", list(metric_labels.keys()))
+            rolling_df = rolling[metric_labels[metric_label]]
+            if isinstance(rolling_df.columns, pd.MultiIndex):
+                asset = st.selectbox("Asset", list(asset_returns.columns))
+                rolling_df = rolling_df.xs(asset, level='asset', axis=1)
+            st.line_chart(rolling_df.dropna(how='all'))
+
         else:
             st.warning("Not enough data to calculate performance.")
     else:
@@ -795,7 +967,6 @@ with st.sidebar:
     st.caption("Database Management")
     if st.button("Reset All Data (Clear DB)"):
         try:
-            import os
             if os.path.exists(DB_NAME):
                 os.remove(DB_NAME)
                 st.success("Database deleted! Please refresh page.")
@@ -804,12 +975,29 @@ with st.sidebar:
         except Exception as e:
             st.error(f"Error: {e}")
 
-    with open(DB_NAME, "rb") as fp:
-        btn = st.download_button(
-            label="💾 Backup Database (Download .db)",
-            data=fp,
-            file_name="portfolio_backup.db",
-            mime="application/x-sqlite3")
+    # snapshots are only taken on demand (or on schedule), never on a normal rerun
+    if BACKUP_INTERVAL_HOURS > 0:
+        try:
+            backup_manager.backup_if_due(DB_NAME, interval_hours=BACKUP_INTERVAL_HOURS)
+        except Exception as e:
+            st.error(f"Scheduled backup failed: {e}")
+
+    if st.button("💾 Create Backup"):
+        try:
+            st.session_state['backup_path'] = backup_manager.create_backup(DB_NAME)
+        except Exception as e:
+            st.error(f"Backup failed: {e}")
+
+    # the file is only read while a fresh backup is waiting to be downloaded
+    backup_path = st.session_state.get('backup_path')
+    if backup_path and os.path.exists(backup_path):
+        with open(backup_path, "rb") as fp:
+            st.download_button(
+                label="Download Backup",
+                data=fp,
+                file_name=os.path.basename(backup_path),
+                mime=backup_manager.mime_type(backup_path),
+                on_click=lambda: st.session_state.pop('backup_path', None))
 
 with tab4:
     st.subheader("Transaction History")
@@ -840,3 +1028,188 @@ with tab4:
                     st.error(f"Error deleting: {e}")
             else:
                 st.warning("Please enter a valid ID greater than 0")
+
+with tab5:
+    st.subheader("Monte Carlo Projection")
+    st.caption("Simulated future value of your current holdings in THB (buy-and-hold, correlated draws from price history)")
+
+    if 'holdings_df' not in locals() or holdings_df.empty:
+        st.info("No active holdings to project.")
+    else:
+        p1, p2, p3, p4 = st.columns(4)
+        years = p1.slider("Years", 1, 30, 10)
+        n_paths = p2.selectbox("Paths", [10_000, 50_000, 100_000, 250_000], index=2)
+        method = p3.radio("Method", ["bootstrap", "normal"], horizontal=True,
+                          help="bootstrap = resample historical months, normal = fitted correlated log-normal")
+        lookback = p4.selectbox("History (years)", [1, 3, 5, 10], index=2)
+
+        if st.button("Run Simulation"):
+            sim = None
+            with st.spinner(f"Simulating {n_paths:,} paths..."):
+                sim_returns, held = get_projection_returns(list(holdings_df['ticker']), lookback)
+                if held:
+                    sim_values = holdings_df.set_index('ticker').loc[held, 'Market Value']
+                    try:
+                        sim = simulate(sim_values.to_numpy(), sim_returns[held], years=years, n_paths=n_paths, method=method)
+                    except ValueError as e:
+                        st.warning(f"Cannot run the simulation: {e}")
+                else:
+                    st.warning("Could not load price history for your holdings. Please try again later.")
+
+            if sim is not None:
+                st.line_chart(sim['bands'])
+
+                s1, s2, s3 = st.columns(3)
+                s1.metric("Median Value", f"฿{sim['median_final']:,.0f}")
+                s2.metric("Today", f"฿{sim_values.sum():,.0f}")
+                s3.metric("Probability of Loss", f"{sim['prob_loss']:.1f}%")
+
+                st.caption("Probability of a peak-to-trough drawdown at least this deep")
+                st.dataframe(sim['prob_drawdown'], use_container_width=True)
+
+with tab6:
+    st.subheader("Fundamentals Screener")
+    st.caption("Screens run on the local fundamentals store; only 'Refresh' talks to Yahoo Finance")
+
+    universe = list(WATCHLIST_TICKERS)
+    if 'holdings_df' in locals() and not holdings_df.empty:
+        universe += list(holdings_df['ticker'])
+    if SCREENER_UNIVERSE and os.path.exists(SCREENER_UNIVERSE):
+        with open(SCREENER_UNIVERSE) as f:
+            universe += [line.strip().upper() for line in f if line.strip()]
+    extra = st.text_area("Extra tickers", placeholder="e.g. ORCL, PTT.BK, SHOP")
+    universe += [t.strip().upper() for t in extra.replace("\n", ",").split(",") if t.strip()]
+    universe = list(dict.fromkeys(universe))
+    universe_meta = load_symbols(conn, universe)
+    universe = [t for t in universe if asset_class_of(universe_meta, t) != "Crypto"]
+
+    fund_table = fundamentals_store.load()
+    stored = len(fund_table.symbols) if fund_table is not None else 0
+    st.write(f"Universe: {len(universe):,} tickers | Stored: {stored:,}")
+
+    if st.button("Refresh Fundamentals"):
+        bar = st.progress(0.0)
+        try:
+            fund_table = fundamentals_store.refresh_universe(
+                universe, progress=lambda done, total: bar.progress(done / total, text=f"{done:,}/{total:,}"))
+        except TimeoutError as e:
+            st.warning(f"{e}. Please try again shortly.")
+
+    f1, f2, f3, f4 = st.columns(4)
+    max_peg = f1.number_input("Max PEG", value=1.0, step=0.1)
+    max_pe = f2.number_input("Max P/E", value=25.0, step=1.0)
+    min_growth = f3.number_input("Min EPS Growth %", value=None, step=5.0,
+                                 help="Leave empty to keep symbols without EPS history")
+    recs = f4.multiselect("Analyst Rec", fund_table.rec_labels if fund_table is not None else [])
+    universe_only = st.checkbox("Only tickers in the universe above", value=False)
+
+    results = fundamentals_store.screen(fund_table, max_peg=max_peg, max_pe=max_pe, min_growth=min_growth,
+                                       recs=recs, symbols=universe if universe_only else None)
+    if results.empty:
+        st.info("No matches. Refresh fundamentals or loosen the filters.")
+    else:
+        st.dataframe(
+            results,
+            use_container_width=True,
+            column_config={
+                "PE": st.column_config.NumberColumn(format="%.2f"),
+                "PEG": st.column_config.NumberColumn(format="%.2f"),
+                "EPS Growth %": st.column_config.NumberColumn(format="%.2f%%"),
+            },
+            hide_index=True
+        )
+
+with tab7:
+    st.subheader("What-If Simulator")
+    st.caption("Hypothetical trades on your current holdings and prices. Nothing is saved to the database.")
+
+    if 'holdings_df' not in locals() or holdings_df.empty:
+        st.info("No active holdings to simulate.")
+    else:
+        st.markdown("#### Hypothetical Trades")
+        trade_input = st.data_editor(
+            pd.DataFrame({"Ticker": pd.Series(dtype=str), "Side": pd.Series(dtype=str),
+                          "Quantity": pd.Series(dtype=float), "Fraction %": pd.Series(dtype=float),
+                          "Price": pd.Series(dtype=float)}),
+            num_rows="dynamic",
+            use_container_width=True,
+            column_config={
+                "Side": st.column_config.SelectboxColumn(options=["BUY", "SELL"], default="BUY"),
+                "Fraction %": st.column_config.NumberColumn(help="Share of the current holding (leave Quantity empty)"),
+                "Price": st.column_config.NumberColumn(help="Execution price, defaults to the current price"),
+            },
+            key="what_if_trades"
+        )
+        trade_input = trade_input.dropna(subset=["Ticker"])
+        trade_input = trade_input[trade_input["Ticker"].str.strip() != ""]
+
+        if not trade_input.empty:
+            trade_tickers = [t.strip().upper() for t in trade_input["Ticker"]]
+            state = build_what_if_state(holdings_df, symbol_meta, live_fx, trade_tickers)
+            trades = []
+            for t, (_, row) in zip(trade_tickers, trade_input.iterrows()):
+                trades.append({
+                    'ticker': t,
+                    'side': row['Side'] if pd.notna(row['Side']) else "BUY",
+                    'quantity': row['Quantity'] if pd.notna(row['Quantity']) else None,
+                    'fraction': row['Fraction %'] / 100 if pd.notna(row['Fraction %']) else 0.0,
+                    'price': row['Price'] if pd.notna(row['Price']) else None,
+                })
+
+            try:
+                allocation, sectors, summary = what_if(state, trades)
+            except ValueError as e:
+                st.error(str(e))
+                summary = None
+
+            if summary is not None:
+                if not summary['feasible']:
+                    st.error("A SELL is larger than the position held; the result assumes the whole position is sold.")
+
+                w1, w2, w3 = st.columns(3)
+                w1.metric("Realized P/L", f"฿{summary['realized_pnl']:,.0f}")
+                w2.metric("Net Cash", f"฿{summary['cash_flow']:,.0f}", help="Positive = cash freed up by the trades")
+                w3.metric("Portfolio Value After", f"฿{summary['total_value']:,.0f}")
+
+                a1, a2 = st.columns(2)
+                a1.dataframe(allocation.style.format({"Quantity": "{:,.4f}", "Market Value": "฿{:,.0f}",
+                                                      "Weight Before %": "{:.2f}%", "Weight After %": "{:.2f}%"}),
+                             use_container_width=True, hide_index=True)
+                a2.dataframe(sectors.style.format({"Before %": "{:.2f}%", "After %": "{:.2f}%"}),
+                             use_container_width=True, hide_index=True)
+
+        st.divider()
+
+        st.markdown("#### Rebalancing Solver")
+        st.caption("Minimal-turnover trades to reach target weights")
+        current_values = holdings_df.set_index('ticker')['Market Value']
+        target_input = st.data_editor(
+            pd.DataFrame({"Ticker": current_values.index,
+                          "Target %": (current_values / current_values.sum() * 100).round(2).to_numpy()}),
+            num_rows="dynamic",
+            use_container_width=True,
+            key="rebalance_targets"
+        ).dropna()
+
+        b1, b2, b3, b4 = st.columns(4)
+        new_cash = b1.number_input("New Cash (฿)", min_value=0.0, value=0.0, step=1000.0)
+        band = b2.number_input("Tolerance Band (%)", min_value=0.0, value=0.0, step=0.5,
+                               help="Skip assets already within this many points of target") / 100
+        allow_sells = b3.checkbox("Allow Sells", value=True)
+        whole_shares = b4.checkbox("Whole Shares Only", value=False, help="Round stock trades down to whole shares")
+
+        targets = {str(t).strip().upper(): w for t, w in zip(target_input["Ticker"], target_input["Target %"])}
+        if targets and sum(targets.values()) > 0:
+            state = build_what_if_state(holdings_df, symbol_meta, live_fx, list(targets))
+            whole_units = [t for t in state.tickers if asset_class_of(symbol_meta, t) == "Stock"] if whole_shares else None
+            rebalance_trades, turnover, leftover = rebalance(state, targets, cash=new_cash, band=band,
+                                                             allow_sells=allow_sells, whole_units=whole_units)
+            r1, r2 = st.columns(2)
+            r1.metric("Turnover", f"฿{turnover:,.0f}")
+            r2.metric("Leftover Cash", f"฿{leftover:,.0f}")
+            if rebalance_trades.empty:
+                st.success("Already on target.")
+            else:
+                st.dataframe(rebalance_trades.style.format({"Quantity": "{:,.4f}", "Trade Value": "฿{:,.0f}",
+                                                            "Target %": "{:.2f}%"}),
+                             use_container_width=True, hide_index=True)
@@ -0,0 +1,110 @@
+import gzip
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BACKUP_DIR = os.environ.get("BACKUP_DIR", "backups")
+CHUNK_SIZE = 1024 * 1024
+PAGES_PER_STEP = 256
+
+MIME_TYPES = {
+    "zstd": "application/zstd",
+    "gzip": "application/gzip",
+}
+EXTENSIONS = {
+    "zstd": ".db.zst",
+    "gzip": ".db.gz",
+}
+
+
+def default_method():
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def snapshot(db_path, dest_path, pages=PAGES_PER_STEP, sleep=0.0):
+    # SQLite's online backup API copies a consistent image even while the app
+    # is writing; stepping `pages` at a time keeps each read lock short.
+    with sqlite3.connect(db_path) as src, sqlite3.connect(dest_path) as dst:
+        src.backup(dst, pages=pages, sleep=sleep)
+    return dest_path
+
+
+def _open_compressed(path, method):
+    if method == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd backups need the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"), closefd=True)
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+def compress_file(src_path, dest_path, method=None, chunk_size=CHUNK_SIZE):
+    method = method or default_method()
+    with open(src_path, "rb") as src, _open_compressed(dest_path, method) as dst:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            dst.write(chunk)
+    return dest_path
+
+
+def create_backup(db_path, backup_dir=BACKUP_DIR, method=None, pages=PAGES_PER_STEP):
+    method = method or default_method()
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(backup_dir, f"portfolio-{stamp}")
+    raw_path = base + ".snapshot"
+    out_path = base + EXTENSIONS[method]
+    tmp_path = out_path + ".tmp"
+
+    try:
+        snapshot(db_path, raw_path, pages=pages)
+        compress_file(raw_path, tmp_path, method)
+        os.replace(tmp_path, out_path)
+    finally:
+        for path in (raw_path, tmp_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return out_path
+
+
+def list_backups(backup_dir=BACKUP_DIR):
+    if not os.path.isdir(backup_dir):
+        return []
+    names = [n for n in os.listdir(backup_dir) if n.endswith(tuple(EXTENSIONS.values()))]
+    return sorted((os.path.join(backup_dir, n) for n in names), key=os.path.getmtime)
+
+
+def prune_backups(backup_dir=BACKUP_DIR, keep=7):
+    backups = list_backups(backup_dir)
+    for path in backups[:max(len(backups) - keep, 0)]:
+        os.remove(path)
+
+
+def backup_if_due(db_path, backup_dir=BACKUP_DIR, interval_hours=24, keep=7, method=None):
+    # Cheap enough to call on every render: one listdir plus a stat() per kept
+    # backup unless one is due. Skipped when the database has not changed since the last one.
+    if not os.path.exists(db_path):
+        return None
+    backups = list_backups(backup_dir)
+    if backups:
+        last = os.path.getmtime(backups[-1])
+        if time.time() - last < interval_hours * 3600 or os.path.getmtime(db_path) <= last:
+            return None
+
+    path = create_backup(db_path, backup_dir, method)
+    prune_backups(backup_dir, keep)
+    return path
+
+
+def mime_type(path):
+    for method, ext in EXTENSIONS.items():
+        if path.endswith(ext):
+            return MIME_TYPES[method]
+    return "application/octet-stream"
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+CASH_TICKERS = ["THB", "USD"]
+TRADE_TYPES = ["BUY", "SELL", "DIVIDEND"]
+EXTERNAL_TYPES = ["DEPOSIT", "WITHDRAW"]
+DEFAULT_FX = 34.0
+
+
+def guess_currency(ticker):
+    if ticker in CASH_TICKERS:
+        return ticker
+    if isinstance(ticker, str) and ticker.endswith(".BK"):
+        return "THB"
+    return "USD"
+
+
+def _normalize(df, default_fx, currencies=None):
+    df = df.copy()
+    for col in ["quantity", "price", "fee", "wht"]:
+        if col not in df:
+            df[col] = 0.0
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+
+    if "currency" not in df:
+        df["currency"] = None
+    if "fx_rate" not in df:
+        df["fx_rate"] = np.nan
+
+    df["date"] = pd.to_datetime(df["date"])
+    df["platform"] = df["platform"].fillna("Other")
+    currencies = currencies or {}
+    native = df["ticker"].map(lambda t: currencies.get(t) or guess_currency(t))
+    df["currency"] = df["currency"].where(df["currency"].notna(), native)
+    df["fx_rate"] = pd.to_numeric(df["fx_rate"], errors="coerce").fillna(default_fx)
+
+    sort_cols = ["date", "id"] if "id" in df else ["date"]
+    return df.sort_values(sort_cols, kind="stable").reset_index(drop=True)
+
+
+def build_flows(df, default_fx=DEFAULT_FX, currencies=None):
+    # One row per transaction with its signed effect on the platform's cash
+    # balance (native currency and THB). BUY/WITHDRAW drain cash, SELL/DEPOSIT/DIVIDEND add to it.
+    if df.empty:
+        return pd.DataFrame(columns=["date", "year", "platform", "ticker", "type", "currency",
+                                     "cash_delta", "cash_delta_thb", "wht", "external"])
+
+    df = _normalize(df, default_fx, currencies)
+    gross = df["quantity"].to_numpy() * df["price"].to_numpy()
+    fee = df["fee"].to_numpy()
+    tx_type = df["type"].to_numpy()
+
+    inflow = np.isin(tx_type, ["SELL", "DEPOSIT", "DIVIDEND"])
+    outflow = np.isin(tx_type, ["BUY", "WITHDRAW"])
+    cash_delta = np.where(inflow, gross - fee, np.where(outflow, -(gross + fee), 0.0))
+
+    fx = np.where(df["currency"].to_numpy() == "THB", 1.0, df["fx_rate"].to_numpy())
+
+    return pd.DataFrame({
+        "date": df["date"],
+        "year": df["date"].dt.year,
+        "platform": df["platform"],
+        "ticker": df["ticker"],
+        "type": df["type"],
+        "currency": df["currency"],
+        "cash_delta": cash_delta,
+        "cash_delta_thb": cash_delta * fx,
+        "wht": df["wht"],
+        "external": np.isin(tx_type, EXTERNAL_TYPES),
+    })
+
+
+def build_cash_ledger(df, default_fx=DEFAULT_FX, currencies=None):
+    flows = build_flows(df, default_fx, currencies)
+    if flows.empty:
+        flows["balance"] = []
+        return flows
+
+    flows["balance"] = flows.groupby(["platform", "currency"])["cash_delta"].cumsum()
+    return flows
+
+
+def cash_balances(ledger):
+    if ledger.empty:
+        return pd.DataFrame()
+    balances = ledger.groupby(["platform", "currency"])["cash_delta"].sum()
+    return balances.unstack("currency", fill_value=0.0)
+
+
+def dividend_summary(ledger):
+    divs = ledger[ledger["type"] == "DIVIDEND"]
+    if divs.empty:
+        return pd.DataFrame()
+    return divs.groupby("ticker").agg(
+        net=("cash_delta", "sum"),
+        net_thb=("cash_delta_thb", "sum"),
+        wht=("wht", "sum"),
+    )
+
+
+def withholding_by_currency(ledger):
+    # WHT is booked in each dividend's own currency, so it is only summed within one
+    divs = ledger[ledger["type"] == "DIVIDEND"]
+    wht = divs.groupby("currency")["wht"].sum()
+    return wht[wht != 0]
+
+
+def xirr_batch(amounts, times, tol=1e-8, max_iter=50, lo=-0.9999, hi=100.0):
+    # amounts/times are (n_portfolios, n_flows); padding slots carry amount 0.
+    # Newton for every row at once, then vectorized bisection for the rows
+    # that did not converge (or wandered below -100%).
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+    times = np.broadcast_to(np.atleast_2d(np.asarray(times, dtype=float)), amounts.shape)
+    n = amounts.shape[0]
+
+    valid = (amounts > 0).any(axis=1) & (amounts < 0).any(axis=1)
+    scale = np.abs(amounts).sum(axis=1)
+    scale[scale == 0] = 1.0
+
+    def npv(rate):
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            disc = (1.0 + rate[:, None]) ** -times
+            return (amounts * disc).sum(axis=1), (-times * amounts * disc).sum(axis=1) / (1.0 + rate)
+
+    rate = np.full(n, 0.1)
+    done = ~valid
+    for _ in range(max_iter):
+        active = ~done
+        if not active.any():
+            break
+        f, df = npv(rate)
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            step = f / df
+        rate = np.where(active, rate - step, rate)
+        bad = active & (~np.isfinite(rate) | (rate <= -1.0))
+        rate[bad] = np.nan
+        done |= bad | (active & (np.abs(step) < tol))
+
+    f, _ = npv(rate)
+    converged = valid & np.isfinite(rate) & (np.abs(f) / scale < 1e-6)
+
+    retry = valid & ~converged
+    if retry.any():
+        lo_r = np.full(n, lo)
+        hi_r = np.full(n, hi)
+        f_lo, _ = npv(lo_r)
+        f_hi, _ = npv(hi_r)
+        bracketed = retry & (np.sign(f_lo) != np.sign(f_hi))
+        for _ in range(200):
+            mid = (lo_r + hi_r) / 2
+            f_mid, _ = npv(mid)
+            same = np.sign(f_mid) == np.sign(f_lo)
+            lo_r = np.where(same, mid, lo_r)
+            f_lo = np.where(same, f_mid, f_lo)
+            hi_r = np.where(same, hi_r, mid)
+            if np.nanmax(np.where(bracketed, hi_r - lo_r, 0.0)) < tol:
+                break
+        rate = np.where(bracketed, (lo_r + hi_r) / 2, rate)
+        converged |= bracketed
+
+    return np.where(converged, rate, np.nan)
+
+
+def pack_flows(flows, by, amount_col="cash_delta_thb"):
+    # Lay grouped flows out as padded (group, flow) matrices for xirr_batch.
+    grouped = flows.groupby(by, sort=True)
+    index = grouped.size().index
+    codes = grouped.ngroup().to_numpy()
+    n = len(index)
+
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+    counts = np.bincount(codes, minlength=n)
+    starts = np.cumsum(counts) - counts
+    slot = np.arange(len(codes)) - np.repeat(starts, counts)
+
+    days = flows["date"].to_numpy().astype("datetime64[D]").astype(np.int64)[order]
+    first = np.full(n, np.iinfo(np.int64).max)
+    np.minimum.at(first, codes, days)
+
+    width = int(counts.max()) if n else 0
+    amounts = np.zeros((n, width))
+    times = np.zeros((n, width))
+    amounts[codes, slot] = flows[amount_col].to_numpy()[order]
+    times[codes, slot] = (days - first[codes]) / 365.0
+    return index, amounts, times
+
+
+def money_weighted_returns(flows, by, terminal_values=None, as_of=None, amount_col="cash_delta_thb"):
+    # XIRR for every group in one batch. terminal_values is the group's value
+    # at as_of (indexed like the groups) and is treated as a final inflow.
+    by = [by] if isinstance(by, str) else list(by)
+    flows = flows[by + ["date", amount_col]]
+
+    if terminal_values is not None and len(terminal_values):
+        as_of = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.today().normalize()
+        terminal = terminal_values.rename(amount_col).reset_index()
+        terminal.columns = by + [amount_col]
+        terminal["date"] = as_of
+        flows = pd.concat([flows, terminal[by + ["date", amount_col]]], ignore_index=True)
+
+    if flows.empty:
+        return pd.Series(dtype=float)
+
+    index, amounts, times = pack_flows(flows, by, amount_col)
+    return pd.Series(xirr_batch(amounts, times), index=index, name="xirr")
+
+
+def security_flows(ledger):
+    # Investor's view of each holding: buys are outflows, sells and dividends inflows.
+    return ledger[~ledger["external"] & ~ledger["ticker"].isin(CASH_TICKERS)]
+
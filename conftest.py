@@ -0,0 +1 @@
+# Lets plain `pytest` import the app modules from the repo root.
@@ -1,5 +1,7 @@
 import sqlite3
 
+from schema import ensure_perf_tables, ensure_symbols_table
+
 DB_NAME = 'portfolio.db'
 
 def init_db():
@@ -23,6 +25,8 @@ def init_db():
             )
         ''')
         
+        ensure_symbols_table(conn)
+        ensure_perf_tables(conn)
         conn.commit()
         print(f"Database '{DB_NAME}' initial successed.")
 
@@ -0,0 +1,211 @@
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from store_files import acquire_lock, read_index, release_lock, write_index
+
+FUNDAMENTALS_DIR = os.environ.get("FUNDAMENTALS_DIR", "fundamentals_store")
+EPS_YEARS = 5
+BATCH_SIZE = 100
+FETCH_WORKERS = 16
+COLUMNS = ["pe", "yahoo_peg", "rec", "eps", "refreshed"]
+LOCK_WAIT = 60
+
+
+class FundamentalsTable:
+    # One array per field, memory-mapped read-only; row i is symbols[i].
+    # eps is (n_symbols, EPS_YEARS), latest year first, NaN-padded.
+
+    def __init__(self, symbols, rec_labels, arrays):
+        self.symbols = symbols
+        self.rec_labels = rec_labels
+        self.pe = arrays["pe"]
+        self.yahoo_peg = arrays["yahoo_peg"]
+        self.rec = arrays["rec"]
+        self.eps = arrays["eps"]
+        self.refreshed = arrays["refreshed"]
+        self.row = {s: i for i, s in enumerate(symbols)}
+
+
+def eps_cagr(eps):
+    # EPS CAGR in % per row, from the latest to the oldest reported year.
+    # Column j is j years back, so gaps in between still count as years.
+    # Rows with fewer than two years or a non-positive end point are NaN.
+    eps = np.atleast_2d(np.asarray(eps, dtype=float))
+    valid = ~np.isnan(eps)
+    last = np.where(valid.any(axis=1), eps.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1), 0)
+    latest = eps[:, 0]
+    oldest = eps[np.arange(len(eps)), last]
+    years = last
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ok = (years >= 1) & (latest > 0) & (oldest > 0)
+        cagr = np.where(ok, (latest / np.where(ok, oldest, 1.0)) ** (1.0 / np.maximum(years, 1)) - 1, np.nan)
+    return cagr * 100
+
+
+def effective_peg(pe, yahoo_peg, growth):
+    # same rule as the dashboard: trust Yahoo's PEG unless missing or > 5,
+    # then use PE / historical EPS growth if that exists, else keep Yahoo's
+    with np.errstate(invalid="ignore", divide="ignore"):
+        real_peg = np.where(growth > 0, pe / growth, np.nan)
+    use_real = (np.isnan(yahoo_peg) | (yahoo_peg > 5)) & ~np.isnan(real_peg)
+    return np.where(use_real, real_peg, yahoo_peg), use_real
+
+
+def fetch_fundamentals(ticker):
+    row = {"symbol": ticker, "pe": np.nan, "yahoo_peg": np.nan, "rec": "N/A", "eps": [np.nan] * EPS_YEARS}
+    try:
+        stock = yf.Ticker(ticker)
+        info = stock.info or {}
+        pe = info.get('forwardPE', info.get('trailingPE', None))
+        peg = info.get('pegRatio', None)
+        row["pe"] = float(pe) if pe is not None else np.nan
+        row["yahoo_peg"] = float(peg) if peg is not None else np.nan
+        row["rec"] = (info.get('recommendationKey') or 'N/A').upper().replace('_', ' ')
+
+        financials = stock.financials
+        if not financials.empty:
+            for label in ['Diluted EPS', 'Basic EPS']:
+                if label in financials.index:
+                    eps = financials.loc[label].astype(float).tolist()[:EPS_YEARS]
+                    row["eps"] = eps + [np.nan] * (EPS_YEARS - len(eps))
+                    break
+    except Exception:
+        pass
+    return row
+
+
+def load(store_dir=FUNDAMENTALS_DIR):
+    index = read_index(store_dir)
+    if index is None:
+        return None
+    version_dir = os.path.join(store_dir, index["version"])
+    try:
+        arrays = {c: np.load(os.path.join(version_dir, f"{c}.npy"), mmap_mode="r") for c in COLUMNS}
+    except OSError:
+        return None
+    return FundamentalsTable(index["symbols"], index["rec_labels"], arrays)
+
+
+def _publish(store_dir, symbols, rec_labels, arrays):
+    # new version directory, then swap index.json; readers never see a mix
+    version = uuid.uuid4().hex[:12]
+    version_dir = os.path.join(store_dir, version)
+    os.makedirs(version_dir)
+    for name, values in arrays.items():
+        np.save(os.path.join(version_dir, f"{name}.npy"), values)
+
+    old = read_index(store_dir)
+    write_index(store_dir, {"version": version, "symbols": symbols, "rec_labels": rec_labels}, version)
+
+    if old is not None:
+        shutil.rmtree(os.path.join(store_dir, old["version"]), ignore_errors=True)
+
+
+def refresh_universe(tickers, store_dir=FUNDAMENTALS_DIR, batch_size=BATCH_SIZE, workers=FETCH_WORKERS,
+                     progress=None):
+    # Fetch in parallel batches and merge into the store: refreshed symbols
+    # overwrite their row, new ones are appended, everything else is kept.
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    os.makedirs(store_dir, exist_ok=True)
+    fetched = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(0, len(tickers), batch_size):
+            fetched += list(pool.map(fetch_fundamentals, tickers[i:i + batch_size]))
+            if progress is not None:
+                progress(min(i + batch_size, len(tickers)), len(tickers))
+    if not fetched:
+        return load(store_dir)
+
+    # merging and publishing happen under the writer lock, so a concurrent
+    # refresh merges into this version instead of overwriting it
+    deadline = time.time() + LOCK_WAIT
+    lock = acquire_lock(store_dir)
+    while lock is None:
+        if time.time() > deadline:
+            raise TimeoutError("Another refresh is still writing the fundamentals store")
+        time.sleep(0.2)
+        lock = acquire_lock(store_dir)
+    try:
+        _merge_and_publish(store_dir, fetched)
+    finally:
+        release_lock(lock)
+    return load(store_dir)
+
+
+def _merge_and_publish(store_dir, fetched):
+    current = load(store_dir)
+    symbols = list(current.symbols) if current is not None else []
+    rec_labels = list(current.rec_labels) if current is not None else []
+    row_of = {s: i for i, s in enumerate(symbols)}
+    for r in fetched:
+        if r["symbol"] not in row_of:
+            row_of[r["symbol"]] = len(symbols)
+            symbols.append(r["symbol"])
+        if r["rec"] not in rec_labels:
+            rec_labels.append(r["rec"])
+
+    n = len(symbols)
+    arrays = {
+        "pe": np.full(n, np.nan),
+        "yahoo_peg": np.full(n, np.nan),
+        "rec": np.full(n, rec_labels.index("N/A") if "N/A" in rec_labels else -1, dtype=np.int16),
+        "eps": np.full((n, EPS_YEARS), np.nan),
+        "refreshed": np.full(n, np.datetime64("NaT"), dtype="datetime64[s]"),
+    }
+    if current is not None:
+        k = len(current.symbols)
+        for name in arrays:
+            arrays[name][:k] = getattr(current, name)
+
+    rows = np.array([row_of[r["symbol"]] for r in fetched])
+    arrays["pe"][rows] = [r["pe"] for r in fetched]
+    arrays["yahoo_peg"][rows] = [r["yahoo_peg"] for r in fetched]
+    arrays["rec"][rows] = [rec_labels.index(r["rec"]) for r in fetched]
+    arrays["eps"][rows] = [r["eps"] for r in fetched]
+    arrays["refreshed"][rows] = np.datetime64(pd.Timestamp.now().floor("s").to_datetime64(), "s")
+
+    _publish(store_dir, symbols, rec_labels, arrays)
+
+
+def screen(table, max_peg=None, max_pe=None, min_growth=None, recs=None, symbols=None):
+    # All filters are boolean masks over the column arrays.
+    if table is None or not table.symbols:
+        return pd.DataFrame()
+
+    pe = np.asarray(table.pe)
+    yahoo_peg = np.asarray(table.yahoo_peg)
+    growth = eps_cagr(table.eps)
+    peg, from_history = effective_peg(pe, yahoo_peg, growth)
+    rec_codes = np.asarray(table.rec)
+
+    mask = np.ones(len(pe), dtype=bool)
+    if max_peg is not None:
+        mask &= (peg > 0) & (peg < max_peg)
+    if max_pe is not None:
+        mask &= (pe > 0) & (pe < max_pe)
+    if min_growth is not None:
+        mask &= growth >= min_growth
+    if recs:
+        codes = [table.rec_labels.index(r) for r in recs if r in table.rec_labels]
+        mask &= np.isin(rec_codes, codes)
+    if symbols is not None:
+        mask &= np.isin(np.array(table.symbols, dtype=object), list(symbols))
+
+    idx = np.flatnonzero(mask)
+    labels = np.array(table.rec_labels + ["N/A"], dtype=object)
+    result = pd.DataFrame({
+        "Ticker": np.array(table.symbols, dtype=object)[idx],
+        "PE": pe[idx],
+        "PEG": peg[idx],
+        "PEG Source": np.where(from_history[idx], "Historical CAGR", "Yahoo"),
+        "EPS Growth %": growth[idx],
+        "Rec": labels[rec_codes[idx]],
+    })
+    return result.sort_values("PEG", na_position="last").reset_index(drop=True)
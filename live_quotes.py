@@ -0,0 +1,184 @@
+import csv
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+FX_TICKERS = {"USDTHB=X": "USD"}
+IDLE_TIMEOUT = 30
+
+
+class ReplayFeed:
+    # Replays ticks from a CSV file with `ticker,price` columns (extra columns
+    # are ignored). rate=0 replays as fast as the consumer can take them.
+
+    def __init__(self, path, rate=0, loop=False):
+        self.path = path
+        self.rate = rate
+        self.loop = loop
+        self.stopped = threading.Event()
+
+    def __iter__(self):
+        delay = 1.0 / self.rate if self.rate else 0
+        while not self.stopped.is_set():
+            with open(self.path, newline="") as f:
+                for row in csv.DictReader(f):
+                    if self.stopped.is_set():
+                        return
+                    yield row["ticker"], float(row["price"])
+                    if delay:
+                        time.sleep(delay)
+            if not self.loop:
+                return
+
+    def stop(self):
+        self.stopped.set()
+
+
+class YahooFeed:
+    # Yahoo Finance's websocket stream via yfinance (needs a yfinance with yf.WebSocket).
+
+    def __init__(self, tickers):
+        self.tickers = list(tickers)
+        self.ws = None
+        self.stopped = threading.Event()
+
+    def __iter__(self):
+        if not hasattr(yf, "WebSocket"):
+            raise RuntimeError("This yfinance version has no WebSocket support")
+
+        ticks = queue.Queue()
+        self.ws = yf.WebSocket(verbose=False)
+        self.ws.subscribe(self.tickers)
+        listener = threading.Thread(
+            target=self.ws.listen,
+            args=(lambda msg: ticks.put((msg.get("id"), msg.get("price"))),),
+            daemon=True)
+        listener.start()
+        while not self.stopped.is_set() and (listener.is_alive() or not ticks.empty()):
+            try:
+                ticker, price = ticks.get(timeout=1)
+            except queue.Empty:
+                continue
+            if ticker and price:
+                yield ticker, float(price)
+
+    def stop(self):
+        self.stopped.set()
+        if self.ws is not None:
+            self.ws.close()
+
+
+class LiveValuation:
+    # Keeps market value per holding and per currency bucket current as ticks
+    # arrive. A price tick touches one holding and one bucket; an FX tick only
+    # changes that currency's rate. Totals are read off the buckets, so every
+    # tick is O(1) no matter how many positions are held.
+
+    def __init__(self, holdings_df, prices, fx_rates, currencies):
+        self.tickers = list(holdings_df['ticker'])
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.qty = holdings_df['quantity'].to_numpy(dtype=float)
+        self.cost_thb = holdings_df['cost_thb'].to_numpy(dtype=float)
+        self.price = np.array([prices.get(t, 0.0) for t in self.tickers], dtype=float)
+        self.currency = [currencies.get(t, "USD") for t in self.tickers]
+
+        self.fx = dict(fx_rates)
+        self.fx["THB"] = 1.0
+        self.native_value = self.qty * self.price
+        self.bucket = {}
+        for cur, value in zip(self.currency, self.native_value):
+            self.bucket[cur] = self.bucket.get(cur, 0.0) + value
+        self.total_cost = float(self.cost_thb.sum())
+
+        self.ticks = 0
+        self.last_tick = None
+        self.lock = threading.Lock()
+
+    def on_tick(self, ticker, price):
+        with self.lock:
+            self.ticks += 1
+            self.last_tick = time.time()
+            if ticker in FX_TICKERS:
+                self.fx[FX_TICKERS[ticker]] = price
+                return
+            i = self.index.get(ticker)
+            if i is None:
+                return
+            delta = self.qty[i] * (price - self.price[i])
+            self.price[i] = price
+            self.native_value[i] += delta
+            self.bucket[self.currency[i]] += delta
+
+    def total_value(self):
+        return sum(value * self.fx.get(cur, 1.0) for cur, value in self.bucket.items())
+
+    def snapshot(self):
+        # O(n) table for the UI; called on the throttled refresh, not per tick
+        with self.lock:
+            fx = np.array([self.fx.get(c, 1.0) for c in self.currency])
+            value_thb = self.native_value * fx
+            total = self.total_value()
+            table = pd.DataFrame({
+                'ticker': self.tickers,
+                'Price': self.price.copy(),
+                'Market Value': value_thb,
+                'Unrealized P/L': value_thb - self.cost_thb,
+                'Allocation %': value_thb / total * 100 if total else 0.0,
+            })
+            summary = {
+                'total_value': total,
+                'unrealized_pnl': total - self.total_cost,
+                'ticks': self.ticks,
+                'last_tick': self.last_tick,
+            }
+        return table, summary
+
+
+class QuoteStreamer:
+    # Drains a feed into a LiveValuation on a background thread. The feed is
+    # a lease: if nobody calls snapshot() for idle_timeout seconds (the
+    # browser tab was closed) it is shut down and `expired` is set.
+
+    def __init__(self, feed, valuation, idle_timeout=IDLE_TIMEOUT):
+        self.feed = feed
+        self.valuation = valuation
+        self.idle_timeout = idle_timeout
+        self.error = None
+        self.expired = False
+        self.last_read = time.time()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.watchdog = threading.Thread(target=self._watch, daemon=True)
+
+    def _run(self):
+        try:
+            for ticker, price in self.feed:
+                self.valuation.on_tick(ticker, price)
+        except Exception as e:
+            self.error = e
+
+    def _watch(self):
+        while self.thread.is_alive():
+            if time.time() - self.last_read > self.idle_timeout:
+                self.expired = True
+                self.stop()
+                return
+            time.sleep(1)
+
+    def start(self):
+        self.thread.start()
+        self.watchdog.start()
+        return self
+
+    def snapshot(self):
+        self.last_read = time.time()
+        return self.valuation.snapshot()
+
+    def stop(self):
+        self.feed.stop()
+
+    def is_alive(self):
+        return self.thread.is_alive()
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+PERCENTILES = [5, 25, 50, 75, 95]
+DRAWDOWN_LEVELS = [10, 20, 30, 50]
+TRADING_DAYS = 252
+
+
+def fit_returns(daily_returns, steps_per_year=12, method="bootstrap"):
+    # Turn a dates x assets matrix of daily simple returns into per-step
+    # sampling parameters. Both methods keep the cross-asset correlation:
+    # bootstrap resamples whole rows of overlapping multi-day blocks,
+    # "normal" draws from the fitted mean/covariance via its Cholesky factor.
+    log_ret = np.log1p(daily_returns.fillna(0.0).to_numpy(dtype=float))
+    days = max(int(round(TRADING_DAYS / steps_per_year)), 1)
+
+    if method == "bootstrap":
+        c = np.vstack([np.zeros((1, log_ret.shape[1])), np.cumsum(log_ret, axis=0)])
+        blocks = c[days:] - c[:-days]
+        if len(blocks) == 0:
+            raise ValueError("Not enough price history to bootstrap one step.")
+        return {"method": "bootstrap", "blocks": blocks}
+
+    mu = log_ret.mean(axis=0) * days
+    cov = np.atleast_2d(np.cov(log_ret, rowvar=False)) * days
+    # tiny ridge keeps the factorization stable for near-duplicate assets
+    chol = np.linalg.cholesky(cov + np.eye(len(cov)) * 1e-12)
+    return {"method": "normal", "mu": mu, "chol": chol}
+
+
+def _simulate_chunk(task):
+    seed, n_paths, n_steps, values, params = task
+    rng = np.random.default_rng(seed)
+
+    holdings = np.tile(values, (n_paths, 1))
+    totals = np.empty((n_paths, n_steps + 1), dtype=np.float32)
+    totals[:, 0] = values.sum()
+
+    for step in range(1, n_steps + 1):
+        if params["method"] == "bootstrap":
+            log_step = params["blocks"][rng.integers(0, len(params["blocks"]), n_paths)]
+        else:
+            z = rng.standard_normal((n_paths, len(values)))
+            log_step = params["mu"] + z @ params["chol"].T
+        holdings *= np.exp(log_step)
+        totals[:, step] = holdings.sum(axis=1)
+
+    peak = np.maximum.accumulate(totals, axis=1)
+    max_dd = ((1 - totals / peak).max(axis=1) * 100).astype(np.float32)
+    return totals, max_dd
+
+
+def simulate(values, daily_returns, years=10, n_paths=100_000, method="bootstrap",
+             steps_per_year=12, chunk_size=5_000, workers=None, seed=None):
+    # values: current THB value per asset, aligned with daily_returns columns.
+    # Paths are buy-and-hold; chunks run in a process pool with independent
+    # seeds spawned from one SeedSequence, so results are reproducible.
+    values = np.asarray(values, dtype=float)
+    params = fit_returns(daily_returns, steps_per_year, method)
+    n_steps = int(years * steps_per_year)
+
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, n, n_steps, values, params) for s, n in zip(seeds, sizes)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        results = [_simulate_chunk(t) for t in tasks]
+    else:
+        # forking the threaded Streamlit server can deadlock a child on a held lock
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context("forkserver")) as pool:
+            results = list(pool.map(_simulate_chunk, tasks))
+
+    totals = np.concatenate([r[0] for r in results])
+    max_dd = np.concatenate([r[1] for r in results])
+
+    step_years = np.arange(n_steps + 1) / steps_per_year
+    bands = pd.DataFrame(np.percentile(totals, PERCENTILES, axis=0).T,
+                         index=pd.Index(step_years, name="Years"),
+                         columns=[f"P{p}" for p in PERCENTILES])
+    prob_drawdown = pd.Series([(max_dd >= level).mean() * 100 for level in DRAWDOWN_LEVELS],
+                              index=[f">= {level}%" for level in DRAWDOWN_LEVELS], name="Probability %")
+
+    final = totals[:, -1]
+    start = values.sum()
+    return {
+        "bands": bands,
+        "prob_drawdown": prob_drawdown,
+        "prob_loss": float((final < start).mean() * 100),
+        "median_final": float(np.median(final)),
+        "max_drawdown": max_dd,
+    }
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+from schema import ensure_perf_tables
+
+TX_COLUMNS = ["id", "date", "type", "ticker", "quantity", "price", "fee"]
+PERF_TYPES = ["BUY", "SELL", "DIVIDEND"]
+SERIES_COLUMNS = ["value", "flow", "daily_return", "cum_index"]
+PRICE_SEED_DAYS = 10  # closes loaded before the recomputed range, to forward-fill over weekends and holidays
+
+
+def _tx_frame(transactions_df):
+    tx = transactions_df[transactions_df['type'].isin(PERF_TYPES)]
+    tx = tx.reindex(columns=TX_COLUMNS).copy()
+    tx['date'] = pd.to_datetime(tx['date']).dt.strftime('%Y-%m-%d')
+    for col in ['quantity', 'price', 'fee']:
+        tx[col] = pd.to_numeric(tx[col], errors='coerce').fillna(0.0).astype(float)
+    tx['id'] = tx['id'].astype('int64')
+    return tx.sort_values(['date', 'id']).reset_index(drop=True)
+
+
+def first_changed_date(old_tx, new_tx):
+    # earliest date touched by an added, removed or edited transaction
+    merged = old_tx.merge(new_tx, how='outer', on=TX_COLUMNS, indicator=True)
+    changed = merged[merged['_merge'] != 'both']
+    if changed.empty:
+        return None
+    return pd.Timestamp(changed['date'].min())
+
+
+def compute_range(tx, prices, dates, prev_value=0.0, prev_cum=100.0):
+    # Positions, flows, values and returns for `dates` only. Positions before
+    # dates[0] come from the transactions already booked, so nothing earlier
+    # is touched. prices must already be forward-filled over `dates`.
+    start = dates[0]
+    tx_dates = pd.to_datetime(tx['date'])
+    q = tx['quantity'].to_numpy()
+    signed_qty = np.where(tx['type'] == 'BUY', q, np.where(tx['type'] == 'SELL', -q, 0.0))
+    gross = q * tx['price'].to_numpy()
+    fee = tx['fee'].to_numpy()
+    flow = np.where(tx['type'] == 'BUY', gross + fee,
+                    np.where(tx['type'] == 'SELL', -(gross - fee), -gross))
+
+    moves = pd.DataFrame({'date': tx_dates, 'ticker': tx['ticker'], 'qty': signed_qty, 'flow': flow})
+    tickers = sorted(moves.loc[moves['qty'] != 0, 'ticker'].unique())
+
+    before = moves[moves['date'] < start]
+    base_qty = before.groupby('ticker')['qty'].sum().reindex(tickers, fill_value=0.0)
+
+    inside = moves[moves['date'] >= start]
+    deltas = inside.pivot_table(index='date', columns='ticker', values='qty', aggfunc='sum')
+    deltas = deltas.reindex(index=dates, columns=tickers, fill_value=0.0).fillna(0.0)
+    qty = deltas.cumsum() + base_qty
+
+    daily_flows = inside.groupby('date')['flow'].sum().reindex(dates, fill_value=0.0)
+
+    px = prices.reindex(columns=tickers)
+    value = (qty * px).sum(axis=1, skipna=True).to_numpy()
+    flows = daily_flows.to_numpy()
+
+    prev = np.concatenate([[prev_value], value[:-1]])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ret = np.where(prev > 0, (value - flows) / prev - 1, 0.0)
+    cum = prev_cum * np.cumprod(1 + ret)
+
+    # a held position without a close would be valued at 0 on that day
+    priced = ~((qty.abs() > 1e-12) & px.isna()).any(axis=1).to_numpy()
+    return pd.DataFrame({'value': value, 'flow': flows, 'daily_return': ret, 'cum_index': cum,
+                         'priced': priced}, index=dates)
+
+
+def load_series(conn):
+    series = pd.read_sql("SELECT * FROM perf_series ORDER BY date", conn)
+    series['date'] = pd.to_datetime(series['date'])
+    return series.set_index('date')[SERIES_COLUMNS].astype(float)
+
+
+def update_performance(conn, transactions_df, price_loader, end_date=None):
+    # Bring perf_series up to date and return it. Only days from the earliest
+    # changed transaction (or the last stored day, which may have been built
+    # from a partial close) onwards are recomputed.
+    ensure_perf_tables(conn)
+    new_tx = _tx_frame(transactions_df)
+    if new_tx.empty:
+        conn.execute("DELETE FROM perf_series")
+        conn.execute("DELETE FROM perf_tx")
+        conn.commit()
+        return load_series(conn)
+
+    start_date = pd.Timestamp(new_tx['date'].min())
+    end_date = pd.Timestamp(end_date or pd.Timestamp.today()).normalize()
+    old_tx = pd.read_sql("SELECT * FROM perf_tx", conn)
+    stored = load_series(conn)
+
+    recompute_from = start_date
+    if not stored.empty and stored.index[0] == start_date:
+        changed = first_changed_date(_tx_frame(old_tx) if not old_tx.empty else old_tx.reindex(columns=TX_COLUMNS), new_tx)
+        recompute_from = stored.index[-1] if changed is None else max(min(changed, stored.index[-1]), start_date)
+
+    dates = pd.date_range(start=recompute_from, end=end_date)
+    if len(dates) == 0:
+        return stored
+
+    prev = stored[(stored.index >= start_date) & (stored.index < recompute_from)]
+    prev_value = prev['value'].iloc[-1] if not prev.empty else 0.0
+    prev_cum = prev['cum_index'].iloc[-1] if not prev.empty else 100.0
+
+    # price_loader(symbols, start) -> closes from `start`; only the recomputed
+    # range (plus a few days to forward-fill from) is requested
+    trades = new_tx[new_tx['type'].isin(['BUY', 'SELL'])]
+    tickers = sorted(trades['ticker'].unique())
+    prices = _load_prices(price_loader, tickers, recompute_from - pd.Timedelta(days=PRICE_SEED_DAYS), dates)
+    earlier = trades[pd.to_datetime(trades['date']) < recompute_from]
+    net_qty = earlier['quantity'].where(earlier['type'] == 'BUY', -earlier['quantity']).groupby(earlier['ticker']).sum()
+    held_before = list(net_qty.index[net_qty.abs() > 1e-12])
+    if prices is not None and prices.iloc[0].reindex(held_before).isna().any():
+        # a holding with no close in the seed window (halted, delisted): its
+        # last price is older, so fall back to the whole history
+        prices = _load_prices(price_loader, tickers, start_date, dates)
+    if prices is None:
+        return pd.DataFrame()
+
+    # Stop at the first day a held position has no close: nothing from there
+    # on is stored, so the next run recomputes it once the price arrives.
+    fresh = compute_range(new_tx, prices, dates, prev_value, prev_cum)
+    unpriced = np.flatnonzero(~fresh['priced'].to_numpy())
+    fresh = fresh.iloc[:unpriced[0] if len(unpriced) else len(fresh)][SERIES_COLUMNS]
+
+    rows = [(d.strftime('%Y-%m-%d'), float(r.value), float(r.flow), float(r.daily_return), float(r.cum_index))
+            for d, r in zip(fresh.index, fresh.itertuples(index=False))]
+    conn.execute("DELETE FROM perf_series WHERE date >= ? OR date < ?",
+                 (recompute_from.strftime('%Y-%m-%d'), start_date.strftime('%Y-%m-%d')))
+    conn.executemany("INSERT INTO perf_series (date, value, flow, daily_return, cum_index) VALUES (?,?,?,?,?)", rows)
+    conn.execute("DELETE FROM perf_tx")
+    conn.executemany("INSERT INTO perf_tx (id, date, type, ticker, quantity, price, fee) VALUES (?,?,?,?,?,?,?)",
+                     new_tx[TX_COLUMNS].itertuples(index=False, name=None))
+    conn.commit()
+
+    return pd.concat([prev, fresh]) if not prev.empty else fresh
+
+
+def _load_prices(price_loader, tickers, start, dates):
+    prices = price_loader(tickers, start)
+    if prices is None or prices.empty:
+        return None
+    return prices.reindex(prices.index.union(dates)).ffill().reindex(dates)
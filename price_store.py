@@ -0,0 +1,131 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from store_files import acquire_lock, read_index, release_lock, write_index
+
+PRICE_STORE_DIR = os.environ.get("PRICE_STORE_DIR", "price_store")
+
+_mapped = {}
+
+
+class PriceMatrix:
+    # Read-only date x symbol close matrix backed by a memory-mapped .npy file.
+    # Stored column-major so every symbol's history is one contiguous run.
+
+    def __init__(self, values, dates, symbols, coverage):
+        self.values = values
+        self.dates = dates
+        self.symbols = symbols
+        self.coverage = coverage
+        self._col = {s: i for i, s in enumerate(symbols)}
+
+    def has(self, symbols):
+        return all(s in self._col for s in symbols)
+
+    def frame(self, symbols=None, start=None, end=None):
+        # Zero-copy: each column is a slice of one contiguous run of the mapping
+        # (fancy-indexing several columns at once would copy them out).
+        lo = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start)))
+        hi = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end), side="right"))
+        if symbols is None:
+            return pd.DataFrame(self.values[lo:hi], index=self.dates[lo:hi], columns=list(self.symbols), copy=False)
+        symbols = dict.fromkeys(s for s in symbols if s in self._col)
+        columns = {s: self.values[lo:hi, self._col[s]] for s in symbols}
+        return pd.DataFrame(columns, index=self.dates[lo:hi], columns=list(symbols), copy=False)
+
+
+def load(store_dir=PRICE_STORE_DIR):
+    index = read_index(store_dir)
+    if index is None:
+        return None
+
+    key = (os.path.abspath(store_dir), index["version"])
+    if key not in _mapped:
+        try:
+            values = np.load(os.path.join(store_dir, index["data"]), mmap_mode="r")
+            dates = np.load(os.path.join(store_dir, index["dates"]))
+        except OSError:
+            return None
+        _mapped.clear()
+        _mapped[key] = PriceMatrix(values, pd.DatetimeIndex(dates.astype("datetime64[ns]")),
+                                   index["symbols"], index["coverage"])
+    return _mapped[key]
+
+
+def is_fresh(matrix, symbols, start, max_age=3600 * 12):
+    # every symbol must have been downloaded from `start` (or earlier) within max_age
+    if matrix is None or not matrix.has(symbols):
+        return False
+    start = pd.Timestamp(start)
+    now = pd.Timestamp.now()
+    for s in symbols:
+        covered_from, refreshed = matrix.coverage[s]
+        if pd.Timestamp(covered_from) > start:
+            return False
+        if (now - pd.Timestamp(refreshed)).total_seconds() >= max_age:
+            return False
+    return True
+
+
+def publish(prices, start=None, store_dir=PRICE_STORE_DIR, merge=True):
+    # Single writer: new data goes to fresh files, then the index is swapped
+    # with os.replace so readers see either the old or the new matrix, never
+    # a half-written one. Returns False if another process holds the lock.
+    os.makedirs(store_dir, exist_ok=True)
+    lock = acquire_lock(store_dir)
+    if lock is None:
+        return False
+
+    try:
+        now = pd.Timestamp.now().isoformat()
+        start = pd.Timestamp(start if start is not None else prices.index.min()).isoformat()
+        fetched = [str(s) for s in prices.columns]
+
+        old_index = read_index(store_dir)
+        coverage = {}
+        if merge and old_index is not None:
+            current = load(store_dir)
+            if current is not None:
+                prices = prices.combine_first(current.frame())
+                coverage = dict(current.coverage)
+
+        for s in fetched:
+            covered_from = min(coverage[s][0], start) if s in coverage else start
+            coverage[s] = [covered_from, now]
+
+        prices = prices.sort_index()
+        prices = prices.loc[:, ~prices.columns.duplicated()]
+        version = uuid.uuid4().hex[:12]
+        data_name = f"prices-{version}.npy"
+        dates_name = f"dates-{version}.npy"
+
+        values = np.lib.format.open_memmap(os.path.join(store_dir, data_name), mode="w+", dtype=np.float64,
+                                           shape=prices.shape, fortran_order=True)
+        values[:] = prices.to_numpy(dtype=np.float64)
+        values.flush()
+        del values
+        np.save(os.path.join(store_dir, dates_name), prices.index.to_numpy().astype("datetime64[ns]"))
+
+        index = {
+            "version": version,
+            "data": data_name,
+            "dates": dates_name,
+            "symbols": [str(s) for s in prices.columns],
+            "coverage": coverage,
+            "updated": now,
+        }
+        write_index(store_dir, index, version)
+
+        # readers that still map the old files keep them alive until they remap
+        if old_index is not None:
+            for name in (old_index["data"], old_index["dates"]):
+                try:
+                    os.remove(os.path.join(store_dir, name))
+                except OSError:
+                    pass
+        return True
+    finally:
+        release_lock(lock)
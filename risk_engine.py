@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+BENCHMARKS = {
+    "S&P 500": "^GSPC",
+    "Nasdaq-100": "^NDX",
+    "SET": "^SET.BK",
+    "BTC": "BTC-USD",
+}
+
+TRADING_DAYS = 252
+
+
+def _rolling_sum(x, window):
+    # Sum over the trailing window along axis 0 via a padded cumsum; rows
+    # before the first full window come back as NaN.
+    c = np.cumsum(x, axis=0)
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    out[window - 1] = c[window - 1]
+    out[window:] = c[window:] - c[:-window]
+    return out
+
+
+def _rolling_max_drawdown(returns, window, chunk=512):
+    # Exact peak-to-trough inside each trailing window of returns (T x N),
+    # measured on the growth path including the level the window starts from.
+    t, n = returns.shape
+    out = np.full((t, n), np.nan)
+    if t < window:
+        return out
+    levels = np.vstack([np.ones((1, n)), np.cumprod(1 + returns, axis=0)])
+    windows = sliding_window_view(levels, window + 1, axis=0)
+    for start in range(0, len(windows), chunk):
+        w = windows[start:start + chunk]
+        peak = np.maximum.accumulate(w, axis=-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[window - 1 + start:window - 1 + start + len(w)] = (w / peak - 1).min(axis=-1)
+    return out
+
+
+def rolling_risk(returns, benchmarks, window=63, risk_free=0.0, periods_per_year=TRADING_DAYS):
+    # returns: dates x assets (portfolio + holdings); benchmarks: dates x benchmarks.
+    # Every metric comes out of the same handful of rolling sums, so the cost
+    # is one pass over the matrix regardless of the window length.
+    benchmarks = benchmarks.reindex(returns.index)
+    index = returns.index
+    assets = list(returns.columns)
+    bench_names = list(benchmarks.columns)
+
+    r_raw = returns.to_numpy(dtype=float)
+    b_raw = benchmarks.to_numpy(dtype=float)
+    r = np.nan_to_num(r_raw)
+    b = np.nan_to_num(b_raw)
+    w = float(window)
+    rf = risk_free / periods_per_year
+    ann = np.sqrt(periods_per_year)
+
+    r_gaps = _rolling_sum(np.isnan(r_raw).astype(float), window) > 0
+    b_gaps = _rolling_sum(np.isnan(b_raw).astype(float), window) > 0
+
+    s_r = _rolling_sum(r, window)
+    s_rr = _rolling_sum(r * r, window)
+    s_down = _rolling_sum(np.minimum(r - rf, 0.0) ** 2, window)
+    s_b = _rolling_sum(b, window)
+    s_bb = _rolling_sum(b * b, window)
+    s_rb = _rolling_sum(r[:, :, None] * b[:, None, :], window)
+
+    mean_r = s_r / w
+    mean_b = s_b / w
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_r = np.maximum(s_rr - s_r * s_r / w, 0.0) / (w - 1)
+        var_b = np.maximum(s_bb - s_b * s_b / w, 0.0) / (w - 1)
+        cov = (s_rb - s_r[:, :, None] * s_b[:, None, :] / w) / (w - 1)
+        sd_r = np.sqrt(var_r)
+        down_dev = np.sqrt(s_down / w)
+
+        vol = sd_r * ann
+        sharpe = (mean_r - rf) / sd_r * ann
+        sortino = (mean_r - rf) / down_dev * ann
+        beta = cov / var_b[:, None, :]
+        alpha = ((mean_r - rf)[:, :, None] - beta * (mean_b - rf)[:, None, :]) * periods_per_year
+        te_var = np.maximum(var_r[:, :, None] + var_b[:, None, :] - 2 * cov, 0.0)
+        tracking_error = np.sqrt(te_var) * ann
+        info_ratio = (mean_r[:, :, None] - mean_b[:, None, :]) * periods_per_year / tracking_error
+
+    max_dd = _rolling_max_drawdown(r, window) * 100
+
+    for arr in (vol, sharpe, sortino, max_dd):
+        arr[r_gaps] = np.nan
+    pair_gaps = r_gaps[:, :, None] | b_gaps[:, None, :]
+    for arr in (beta, alpha, tracking_error, info_ratio):
+        arr[pair_gaps] = np.nan
+
+    def frame(arr):
+        return pd.DataFrame(arr, index=index, columns=assets)
+
+    def pair_frame(arr):
+        cols = pd.MultiIndex.from_product([assets, bench_names], names=["asset", "benchmark"])
+        return pd.DataFrame(arr.reshape(len(index), -1), index=index, columns=cols)
+
+    return {
+        "volatility": frame(vol * 100),
+        "sharpe": frame(sharpe),
+        "sortino": frame(sortino),
+        "max_drawdown": frame(max_dd),
+        "beta": pair_frame(beta),
+        "alpha": pair_frame(alpha * 100),
+        "tracking_error": pair_frame(tracking_error * 100),
+        "info_ratio": pair_frame(info_ratio),
+    }
+
+
+def risk_summary(returns, benchmarks, risk_free=0.0, periods_per_year=TRADING_DAYS):
+    # Full-period figures: the rolling kernels with one window spanning the history.
+    returns = returns.dropna(how="all")
+    if len(returns) < 2:
+        return pd.DataFrame(), pd.DataFrame()
+
+    metrics = rolling_risk(returns.fillna(0.0), benchmarks.reindex(returns.index).fillna(0.0),
+                           window=len(returns), risk_free=risk_free, periods_per_year=periods_per_year)
+    per_asset = pd.DataFrame({
+        "Volatility %": metrics["volatility"].iloc[-1],
+        "Sharpe": metrics["sharpe"].iloc[-1],
+        "Sortino": metrics["sortino"].iloc[-1],
+        "Max Drawdown %": metrics["max_drawdown"].iloc[-1],
+    })
+    per_pair = pd.DataFrame({
+        "Beta": metrics["beta"].iloc[-1],
+        "Alpha %": metrics["alpha"].iloc[-1],
+        "Tracking Error %": metrics["tracking_error"].iloc[-1],
+        "Info Ratio": metrics["info_ratio"].iloc[-1],
+    })
+    return per_asset, per_pair
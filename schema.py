@@ -0,0 +1,44 @@
+# Table definitions for the app's caches. Standard library only, so
+# db_manager.py can create every table without the data stack installed.
+
+
+def ensure_symbols_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS symbols (
+            ticker TEXT PRIMARY KEY,      -- AAPL, BTC-USD, PTT.BK, THB
+            sector TEXT,                  -- Technology, Crypto, Cash & Equiv.
+            quote_type TEXT,              -- EQUITY, ETF, CRYPTOCURRENCY, CURRENCY
+            currency TEXT,                -- native trading currency
+            exchange TEXT,                -- NMS, SET, CCC
+            refreshed_at TEXT,            -- ISO timestamp of last refresh
+            failed_at TEXT                -- last failed lookup; retried after a back-off
+        )
+    """)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(symbols)")]
+    if "failed_at" not in columns:
+        conn.execute("ALTER TABLE symbols ADD COLUMN failed_at TEXT")
+    conn.commit()
+
+
+def ensure_perf_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS perf_series (
+            date TEXT PRIMARY KEY,        -- YYYY-MM-DD, every calendar day
+            value REAL NOT NULL,          -- market value of holdings
+            flow REAL NOT NULL,           -- net money into holdings that day
+            daily_return REAL NOT NULL,   -- flow-adjusted (time-weighted) return
+            cum_index REAL NOT NULL       -- growth of 100
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS perf_tx (
+            id INTEGER PRIMARY KEY,       -- snapshot of the transactions perf_series was built from
+            date TEXT,
+            type TEXT,
+            ticker TEXT,
+            quantity REAL,
+            price REAL,
+            fee REAL
+        )
+    """)
+    conn.commit()
@@ -0,0 +1,51 @@
+import json
+import os
+import time
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "writer.lock"
+LOCK_TIMEOUT = 300
+
+
+def read_index(store_dir):
+    try:
+        with open(os.path.join(store_dir, INDEX_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_index(store_dir, index, version):
+    # readers see either the old or the new index, never a half-written one
+    tmp = os.path.join(store_dir, f"{INDEX_FILE}.{version}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(store_dir, INDEX_FILE))
+
+
+def acquire_lock(store_dir):
+    # single-writer lock file; returns its path, or None if another process holds it
+    path = os.path.join(store_dir, LOCK_FILE)
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        # a crashed writer can leave the lock behind
+        try:
+            if time.time() - os.path.getmtime(path) < LOCK_TIMEOUT:
+                return None
+            os.remove(path)
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except OSError:
+            return None
+    os.write(fd, str(os.getpid()).encode())
+    os.close(fd)
+    return path
+
+
+def release_lock(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import yfinance as yf
+
+from cash_ledger import CASH_TICKERS, guess_currency
+from schema import ensure_symbols_table
+
+MAX_AGE_DAYS = 7
+RETRY_HOURS = 6
+BATCH_SIZE = 50
+FETCH_WORKERS = 8
+
+
+def _local_row(ticker):
+    # cash needs no lookup; the rest falls back to ticker-suffix rules when Yahoo is unreachable
+    if ticker in CASH_TICKERS:
+        return (ticker, "Cash & Equiv.", "CURRENCY", ticker, "CASH")
+    if ticker.endswith("-USD"):
+        return (ticker, "Crypto", "CRYPTOCURRENCY", "USD", "CCC")
+    return (ticker, None, None, guess_currency(ticker), None)
+
+
+def _fetch_row(ticker):
+    # returns (row, fetched); rows that fell back to local rules are retried after RETRY_HOURS
+    fallback = _local_row(ticker)
+    if ticker in CASH_TICKERS:
+        return fallback, True
+    try:
+        info = yf.Ticker(ticker).info
+    except Exception:
+        return fallback, False
+    if not info:
+        return fallback, False
+
+    quote_type = info.get('quoteType') or fallback[2]
+    sector = info.get('sector') or fallback[1]
+    row = (ticker, sector, quote_type, info.get('currency') or fallback[3], info.get('exchange') or fallback[4])
+    return row, True
+
+
+def stale_symbols(conn, tickers, max_age_days=MAX_AGE_DAYS, retry_hours=RETRY_HOURS):
+    # failed lookups (unknown ticker, offline) back off for retry_hours instead
+    # of hitting Yahoo again on every rerun
+    tickers = sorted(set(t for t in tickers if t))
+    if not tickers:
+        return []
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+    retry_cutoff = (datetime.now() - timedelta(hours=retry_hours)).isoformat()
+    fresh = set()
+    for i in range(0, len(tickers), 500):
+        chunk = tickers[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        rows = conn.execute(f"SELECT ticker FROM symbols WHERE ticker IN ({marks}) "
+                            f"AND (refreshed_at >= ? OR failed_at >= ?)",
+                            (*chunk, cutoff, retry_cutoff)).fetchall()
+        fresh.update(r[0] for r in rows)
+    return [t for t in tickers if t not in fresh]
+
+
+def refresh_symbols(conn, tickers, max_age_days=MAX_AGE_DAYS, batch_size=BATCH_SIZE, workers=FETCH_WORKERS,
+                    retry_hours=RETRY_HOURS):
+    # Only missing or stale symbols hit the network. Each batch is fetched in
+    # parallel threads and written with one executemany.
+    todo = stale_symbols(conn, tickers, max_age_days, retry_hours)
+    if not todo:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(0, len(todo), batch_size):
+            results = list(pool.map(_fetch_row, todo[i:i + batch_size]))
+            now = datetime.now().isoformat()
+            conn.executemany(
+                "INSERT OR REPLACE INTO symbols (ticker, sector, quote_type, currency, exchange, refreshed_at, failed_at) "
+                "VALUES (?,?,?,?,?,?,NULL)",
+                [row + (now,) for row, fetched in results if fetched])
+            # a failed lookup keeps whatever was stored before and only records when it failed
+            conn.executemany(
+                "INSERT INTO symbols (ticker, sector, quote_type, currency, exchange, failed_at) VALUES (?,?,?,?,?,?) "
+                "ON CONFLICT(ticker) DO UPDATE SET failed_at = excluded.failed_at",
+                [row + (now,) for row, fetched in results if not fetched])
+            conn.commit()
+    return len(todo)
+
+
+def load_symbols(conn, tickers=None):
+    if tickers is None:
+        rows = conn.execute("SELECT ticker, sector, quote_type, currency, exchange FROM symbols").fetchall()
+    else:
+        tickers = list(set(tickers))
+        rows = []
+        for i in range(0, len(tickers), 500):
+            chunk = tickers[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            rows += conn.execute(f"SELECT ticker, sector, quote_type, currency, exchange FROM symbols "
+                                 f"WHERE ticker IN ({marks})", chunk).fetchall()
+    return {r[0]: {'sector': r[1], 'quote_type': r[2], 'currency': r[3], 'exchange': r[4]} for r in rows}
+
+
+def _meta(symbols, ticker):
+    meta = symbols.get(ticker)
+    if meta is None:
+        row = _local_row(ticker)
+        meta = {'sector': row[1], 'quote_type': row[2], 'currency': row[3], 'exchange': row[4]}
+    return meta
+
+
+def sector_of(symbols, ticker):
+    meta = _meta(symbols, ticker)
+    if meta['sector']:
+        return meta['sector']
+    if meta['quote_type'] in ['ETF', 'MUTUALFUND']:
+        return "ETF / Fund"
+    return "Others"
+
+
+def asset_class_of(symbols, ticker):
+    quote_type = _meta(symbols, ticker)['quote_type']
+    if quote_type == 'CRYPTOCURRENCY':
+        return "Crypto"
+    if quote_type == 'CURRENCY':
+        return "Cash "
+    return "Stock"
+
+
+def currency_of(symbols, ticker):
+    return _meta(symbols, ticker)['currency'] or guess_currency(ticker)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cash_ledger import build_cash_ledger, money_weighted_returns, security_flows, xirr_batch
+
+
+def brute_xirr(amounts, times):
+    # plain scalar bisection on NPV
+    def npv(rate):
+        return sum(a * (1 + rate) ** -t for a, t in zip(amounts, times))
+
+    lo, hi = -0.99, 10.0
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if np.sign(npv(mid)) == np.sign(npv(lo)):
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def test_xirr_batch_matches_brute_force():
+    rng = np.random.default_rng(4)
+    n, width = 200, 8
+    times = np.sort(rng.uniform(0, 6, (n, width)), axis=1)
+    times[:, 0] = 0.0
+    amounts = -rng.uniform(10, 1000, (n, width))
+    # a random known rate, with the last flow set so the NPV at it is zero
+    rates = rng.uniform(-0.5, 0.8, n)
+    amounts[:, -1] = 0.0
+    amounts[:, -1] = -(amounts * (1 + rates[:, None]) ** -times).sum(axis=1) * (1 + rates) ** times[:, -1]
+    # some rows padded with empty slots
+    amounts[::3, 3:5] = 0.0
+
+    result = xirr_batch(amounts, times)
+    expected = np.array([brute_xirr(a, t) for a, t in zip(amounts, times)])
+    np.testing.assert_allclose(result, expected, atol=1e-6)
+
+
+def test_xirr_batch_needs_both_signs():
+    assert np.isnan(xirr_batch([[-100.0, -50.0]], [[0.0, 1.0]])).all()
+
+
+def test_money_weighted_return_per_ticker():
+    tx = pd.DataFrame({
+        "id": [1, 2, 3],
+        "date": ["2023-01-01", "2023-01-01", "2024-01-01"],
+        "type": ["BUY", "BUY", "SELL"],
+        "platform": ["Dime"] * 3,
+        "ticker": ["AAA", "BBB", "AAA"],
+        "quantity": [1.0, 1.0, 1.0],
+        "price": [100.0, 100.0, 110.0],
+        "fee": [0.0, 0.0, 0.0],
+        "currency": ["THB"] * 3,
+    })
+    flows = security_flows(build_cash_ledger(tx))
+    xirr = money_weighted_returns(flows, "ticker", pd.Series({"BBB": 121.0}), as_of="2025-01-01")
+    assert xirr["AAA"] == pytest.approx(0.10, abs=1e-6)
+    assert xirr["BBB"] == pytest.approx(0.10, abs=1e-3)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("yfinance")
+
+import fundamentals_store
+from fundamentals_store import eps_cagr, effective_peg, screen
+
+
+def brute_cagr(row):
+    years = [j for j, v in enumerate(row) if not np.isnan(v)]
+    if not years or years[-1] == 0 or row[0] <= 0 or row[years[-1]] <= 0:
+        return np.nan
+    return ((row[0] / row[years[-1]]) ** (1 / years[-1]) - 1) * 100
+
+
+def test_eps_cagr_matches_brute_force():
+    rng = np.random.default_rng(3)
+    eps = rng.uniform(-1, 5, (400, 5))
+    eps[rng.random(eps.shape) < 0.3] = np.nan
+    expected = np.array([brute_cagr(row) for row in eps])
+    np.testing.assert_allclose(eps_cagr(eps), expected, equal_nan=True)
+
+
+def test_eps_cagr_counts_gaps_as_years():
+    assert eps_cagr([4, np.nan, 2, 1, np.nan])[0] == pytest.approx(58.7401, abs=1e-4)
+
+
+def test_effective_peg_keeps_yahoo_without_history():
+    pe = np.array([20.0, 20.0, 20.0, np.nan])
+    yahoo = np.array([0.5, 8.0, 8.0, np.nan])
+    growth = np.array([10.0, np.nan, 10.0, 10.0])
+    peg, from_history = effective_peg(pe, yahoo, growth)
+    np.testing.assert_allclose(peg, [0.5, 8.0, 2.0, np.nan], equal_nan=True)
+    assert from_history.tolist() == [False, False, True, False]
+
+
+def test_screen_keeps_yahoo_peg_without_eps_history(tmp_path, monkeypatch):
+    rows = {
+        "A": {"pe": 15.0, "yahoo_peg": np.nan, "rec": "BUY", "eps": [3, 2, 1, np.nan, np.nan]},
+        "B": {"pe": 20.0, "yahoo_peg": 0.5, "rec": "HOLD", "eps": [np.nan] * 5},
+        "C": {"pe": 40.0, "yahoo_peg": 0.8, "rec": "BUY", "eps": [np.nan] * 5},
+    }
+    monkeypatch.setattr(fundamentals_store, "fetch_fundamentals", lambda t: dict(rows[t], symbol=t))
+    table = fundamentals_store.refresh_universe(list(rows), store_dir=str(tmp_path))
+
+    result = screen(table, max_peg=1.0, max_pe=25.0)
+    assert sorted(result["Ticker"]) == ["A", "B"]
+    assert screen(table, max_peg=1.0, max_pe=25.0, min_growth=0.0)["Ticker"].tolist() == ["A"]
@@ -0,0 +1,96 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from perf_cache import update_performance
+
+END = pd.Timestamp("2024-03-31")
+
+
+def make_prices():
+    dates = pd.bdate_range("2023-12-01", END)
+    rng = np.random.default_rng(7)
+    steps = 1 + rng.normal(0, 0.01, (len(dates), 3))
+    return pd.DataFrame(100 * steps.cumprod(axis=0), index=dates, columns=["AAA", "BBB", "CCC"])
+
+
+PRICES = make_prices()
+
+
+class Loader:
+    def __init__(self, prices=PRICES):
+        self.prices = prices
+        self.starts = []
+
+    def __call__(self, symbols, start):
+        self.starts.append(pd.Timestamp(start))
+        return self.prices.loc[pd.Timestamp(start):, list(symbols)]
+
+
+def tx(*rows):
+    return pd.DataFrame(rows, columns=["id", "date", "type", "ticker", "quantity", "price", "fee"])
+
+
+BASE = tx(
+    (1, "2024-01-03", "BUY", "AAA", 10, 100.0, 1.0),
+    (2, "2024-01-10", "BUY", "BBB", 5, 98.0, 1.0),
+    (3, "2024-02-01", "SELL", "AAA", 4, 103.0, 1.0),
+    (4, "2024-02-15", "DIVIDEND", "BBB", 5, 0.5, 0.0),
+)
+
+
+def full_rebuild(transactions, end_date=END):
+    return update_performance(sqlite3.connect(":memory:"), transactions, Loader(), end_date)
+
+
+def assert_same(incremental, full):
+    assert list(incremental.dtypes) == [np.float64] * 4
+    pd.testing.assert_frame_equal(incremental, full, check_freq=False, rtol=1e-10)
+
+
+@pytest.mark.parametrize("change", [
+    lambda df: pd.concat([df, tx((5, "2024-03-01", "BUY", "CCC", 3, 101.0, 1.0))]),
+    lambda df: pd.concat([df, tx((5, "2024-01-20", "BUY", "AAA", 2, 99.0, 0.0))]),
+    lambda df: pd.concat([df, tx((5, "2023-12-15", "BUY", "CCC", 1, 95.0, 0.0))]),
+    lambda df: df[df["id"] != 1],
+    lambda df: df.assign(quantity=np.where(df["id"] == 3, 2, df["quantity"])),
+])
+def test_incremental_matches_full_rebuild(change):
+    conn = sqlite3.connect(":memory:")
+    update_performance(conn, BASE, Loader(), END - pd.Timedelta(days=10))
+
+    changed = change(BASE).reset_index(drop=True)
+    loader = Loader()
+    incremental = update_performance(conn, changed, loader, END)
+
+    assert_same(incremental, full_rebuild(changed))
+
+
+def test_new_days_only_load_recent_prices():
+    conn = sqlite3.connect(":memory:")
+    update_performance(conn, BASE, Loader(), END - pd.Timedelta(days=10))
+
+    loader = Loader()
+    incremental = update_performance(conn, BASE, loader, END)
+
+    assert loader.starts and min(loader.starts) > pd.Timestamp("2024-03-01")
+    assert_same(incremental, full_rebuild(BASE))
+
+
+def test_cold_start_is_float():
+    series = full_rebuild(BASE)
+    assert list(series.dtypes) == [np.float64] * 4
+    assert series.index[0] == pd.Timestamp("2024-01-03")
+
+
+def test_missing_closes_are_not_stored():
+    conn = sqlite3.connect(":memory:")
+    broken = PRICES.assign(BBB=np.nan)
+    partial = update_performance(conn, BASE, Loader(broken), END - pd.Timedelta(days=10))
+    assert partial.index[-1] < pd.Timestamp("2024-01-10")
+    assert (partial["daily_return"] > -0.5).all()
+
+    incremental = update_performance(conn, BASE, Loader(), END)
+    assert_same(incremental, full_rebuild(BASE))
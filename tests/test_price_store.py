@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+import price_store
+
+
+def closes(start, periods, symbols, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=periods)
+    return pd.DataFrame(rng.uniform(10, 100, (periods, len(symbols))), index=idx, columns=symbols)
+
+
+def assert_same_closes(frame, expected):
+    # the store keeps datetime64[ns]; compare the dates, not their resolution
+    expected = expected.set_axis(expected.index.as_unit("ns"))
+    pd.testing.assert_frame_equal(frame, expected, check_freq=False, check_names=False)
+
+
+def test_frame_returns_published_closes_without_copying(tmp_path):
+    prices = closes("2024-01-01", 60, ["AAPL", "BTC-USD", "^GSPC"])
+    assert price_store.publish(prices, store_dir=str(tmp_path))
+    store = price_store.load(str(tmp_path))
+
+    frame = store.frame(["^GSPC", "BTC-USD", "AAPL", "BTC-USD", "MISSING"], start="2024-01-10", end="2024-02-01")
+    expected = prices.loc["2024-01-10":"2024-02-01", ["^GSPC", "BTC-USD", "AAPL"]]
+    assert list(frame.columns) == ["^GSPC", "BTC-USD", "AAPL"]
+    assert_same_closes(frame, expected)
+    assert all(np.shares_memory(frame[c].to_numpy(), store.values) for c in frame)
+
+
+def test_publish_merges_and_tracks_coverage(tmp_path):
+    store_dir = str(tmp_path)
+    history = closes("2024-01-01", 60, ["AAPL", "MSFT"], seed=1)
+    price_store.publish(history, store_dir=store_dir)
+    recent = closes("2024-02-20", 20, ["AAPL", "NVDA"], seed=2)
+    price_store.publish(recent, start="2024-02-20", store_dir=store_dir)
+    store = price_store.load(store_dir)
+
+    # newer closes win, older ones and untouched symbols are kept
+    merged = recent.combine_first(history)
+    assert_same_closes(store.frame(["AAPL", "MSFT", "NVDA"]), merged[["AAPL", "MSFT", "NVDA"]])
+
+    assert price_store.is_fresh(store, ["AAPL", "MSFT"], "2024-01-01")
+    assert price_store.is_fresh(store, ["NVDA"], "2024-02-20")
+    assert not price_store.is_fresh(store, ["NVDA"], "2024-01-01")
+    assert not price_store.is_fresh(store, ["TSLA"], "2024-02-20")
+
+
+def test_publish_backs_off_while_locked(tmp_path):
+    store_dir = str(tmp_path)
+    (tmp_path / "writer.lock").write_text("123")
+    assert not price_store.publish(closes("2024-01-01", 5, ["AAPL"]), store_dir=store_dir)
+    assert price_store.load(store_dir) is None
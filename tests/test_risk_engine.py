@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_engine import TRADING_DAYS, risk_summary, rolling_risk
+
+
+def window_metrics(r, b, rf):
+    # one window, straight from the definitions
+    ann = np.sqrt(TRADING_DAYS)
+    sd = r.std(ddof=1)
+    down = np.sqrt((np.minimum(r - rf, 0.0) ** 2).mean())
+    levels = np.concatenate([[1.0], np.cumprod(1 + r)])
+    beta = np.cov(r, b, ddof=1)[0, 1] / b.var(ddof=1)
+    return {
+        "volatility": sd * ann * 100,
+        "sharpe": (r.mean() - rf) / sd * ann,
+        "sortino": (r.mean() - rf) / down * ann,
+        "max_drawdown": (levels / np.maximum.accumulate(levels) - 1).min() * 100,
+        "beta": beta,
+        "alpha": ((r.mean() - rf) - beta * (b.mean() - rf)) * TRADING_DAYS * 100,
+        "tracking_error": (r - b).std(ddof=1) * ann * 100,
+    }
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(8)
+    idx = pd.bdate_range("2023-01-02", periods=120)
+    assets = pd.DataFrame(rng.normal(0.0005, 0.015, (120, 2)), index=idx, columns=["My Portfolio", "AAA"])
+    bench = pd.DataFrame(rng.normal(0.0003, 0.01, (120, 2)), index=idx, columns=["S&P 500", "BTC"])
+    return assets, bench
+
+
+def test_rolling_risk_matches_brute_force(returns):
+    assets, bench = returns
+    window, rf = 21, 0.02
+    out = rolling_risk(assets, bench, window=window, risk_free=rf)
+
+    assert out["sharpe"].iloc[:window - 1].isna().all().all()
+    for t in [window - 1, 50, len(assets) - 1]:
+        for asset in assets:
+            r = assets[asset].to_numpy()[t - window + 1:t + 1]
+            for name in bench:
+                b = bench[name].to_numpy()[t - window + 1:t + 1]
+                expected = window_metrics(r, b, rf / TRADING_DAYS)
+                for key in ("volatility", "sharpe", "sortino", "max_drawdown"):
+                    assert out[key][asset].iloc[t] == pytest.approx(expected[key], rel=1e-8)
+                for key in ("beta", "alpha", "tracking_error"):
+                    assert out[key][(asset, name)].iloc[t] == pytest.approx(expected[key], rel=1e-8)
+
+
+def test_gaps_blank_out_their_windows(returns):
+    assets, bench = returns
+    assets = assets.copy()
+    assets.iloc[40, 1] = np.nan
+    out = rolling_risk(assets, bench, window=10)
+    assert out["volatility"]["AAA"].iloc[40:50].isna().all()
+    assert out["volatility"]["AAA"].iloc[50:].notna().all()
+    assert out["volatility"]["My Portfolio"].iloc[40:50].notna().all()
+
+
+def test_summary_uses_the_whole_history(returns):
+    assets, bench = returns
+    per_asset, per_pair = risk_summary(assets, bench)
+    expected = window_metrics(assets["AAA"].to_numpy(), bench["BTC"].to_numpy(), 0.0)
+    assert per_asset.loc["AAA", "Max Drawdown %"] == pytest.approx(expected["max_drawdown"])
+    assert per_pair.loc[("AAA", "BTC"), "Beta"] == pytest.approx(expected["beta"])
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from what_if import PortfolioState, evaluate, rebalance, rebalance_batch, trades_to_matrix, what_if
+
+
+def random_state(rng, n=6):
+    return PortfolioState(
+        [f"T{i}" for i in range(n)],
+        rng.integers(1, 50, n).astype(float),
+        rng.uniform(10, 200, n),
+        rng.uniform(10, 500, n),
+        rng.choice([1.0, 34.0], n),
+        rng.choice(["Tech", "Energy", "Banks"], n),
+    )
+
+
+def test_trades_are_self_funding():
+    rng = np.random.default_rng(11)
+    for _ in range(50):
+        state = random_state(rng)
+        targets = rng.uniform(0, 1, (20, len(state.tickers)))
+        cash = float(rng.choice([0.0, 5000.0]))
+        _, trade_value = rebalance_batch(state, targets, cash=cash, band=0.02)
+        np.testing.assert_allclose(trade_value.sum(axis=1), cash, atol=1e-6)
+
+
+def test_whole_shares_never_overspend():
+    rng = np.random.default_rng(5)
+    for _ in range(50):
+        state = random_state(rng)
+        targets = {t: 1.0 for t in state.tickers}
+        for allow_sells in (True, False):
+            trades, _, leftover = rebalance(state, targets, cash=float(rng.uniform(0, 20000)),
+                                            allow_sells=allow_sells, whole_units=state.tickers)
+            assert leftover >= -1e-6
+            assert np.allclose(trades["Quantity"], np.round(trades["Quantity"]))
+            sold = trades[trades["Side"] == "SELL"].set_index("ticker")["Quantity"]
+            assert (sold <= state.qty[[state.index[t] for t in sold.index]] + 1e-9).all()
+
+
+def test_band_leaves_assets_inside_it_alone():
+    state = PortfolioState(["A", "B", "C"], [33, 33, 34], [1, 1, 1], [1, 1, 1], [1, 1, 1], ["x", "y", "x"])
+    trades, _, leftover = rebalance(state, {"A": 30, "B": 30, "C": 40}, band=0.035)
+    assert trades.empty and leftover == pytest.approx(0.0)
+
+    trades, _, leftover = rebalance(state, {"A": 33, "B": 30, "C": 37}, band=0.01)
+    assert dict(zip(trades["ticker"], trades["Quantity"])) == pytest.approx({"B": 3.0, "C": 3.0})
+    assert leftover == pytest.approx(0.0)
+
+
+def test_buy_only_matches_greedy_fill():
+    # brute force: hand out the cash in small slices, each to the asset
+    # furthest below its target weight
+    rng = np.random.default_rng(2)
+    state = random_state(rng, 5)
+    w = rng.uniform(0.1, 1, 5)
+    w /= w.sum()
+    cash = 0.3 * state.values().sum()
+
+    values = state.values().copy()
+    for _ in range(20000):
+        values[np.argmin(values / w)] += cash / 20000
+
+    _, trade_value = rebalance_batch(state, w, cash=cash, allow_sells=False)
+    assert (trade_value >= -1e-9).all()
+    np.testing.assert_allclose(state.values() + trade_value[0], values, atol=cash / 20000 * 2)
+
+
+def test_same_side_trades_use_weighted_price():
+    state = PortfolioState(["A"], [10], [100], [120], [1], ["x"])
+    _, _, summary = what_if(state, [
+        {"ticker": "A", "side": "SELL", "quantity": 2, "price": 110},
+        {"ticker": "A", "side": "SELL", "quantity": 3, "price": 130},
+    ])
+    # trade by trade: 2 * (110 - 100) + 3 * (130 - 100)
+    assert summary["realized_pnl"] == pytest.approx(110.0)
+    assert summary["cash_flow"] == pytest.approx(2 * 110 + 3 * 130)
+
+
+def test_round_trip_in_one_scenario_is_rejected():
+    state = PortfolioState(["A"], [10], [100], [120], [1], ["x"])
+    with pytest.raises(ValueError):
+        trades_to_matrix(state, [[{"ticker": "A", "side": "BUY", "quantity": 1},
+                                  {"ticker": "A", "side": "SELL", "quantity": 1}]])
+
+
+def test_evaluate_matches_one_scenario_at_a_time():
+    rng = np.random.default_rng(9)
+    state = random_state(rng)
+    delta = rng.integers(-5, 6, (30, len(state.tickers))).astype(float)
+    batch = evaluate(state, delta)
+    for s in range(len(delta)):
+        single = evaluate(state, delta[s])
+        for key in ("qty", "value", "realized_pnl", "cash_flow"):
+            np.testing.assert_allclose(batch[key][s], single[key][0])
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+
+
+class PortfolioState:
+    # Snapshot of the holdings as arrays (one slot per ticker). Prices are in
+    # the asset's own currency; fx turns them into THB. Never written back.
+
+    def __init__(self, tickers, qty, avg_cost, price, fx, sectors):
+        self.tickers = list(tickers)
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.qty = np.asarray(qty, dtype=float)
+        self.avg_cost = np.asarray(avg_cost, dtype=float)
+        self.price = np.asarray(price, dtype=float)
+        self.fx = np.asarray(fx, dtype=float)
+        self.sectors = list(sectors)
+        self.sector_names = sorted(set(self.sectors))
+        self.sector_onehot = (np.array(self.sectors)[:, None] == np.array(self.sector_names)[None, :]).astype(float)
+
+    @classmethod
+    def from_holdings(cls, holdings_df, fx):
+        # holdings_df is the dashboard frame; fx maps ticker -> THB per unit of its currency
+        qty = holdings_df['quantity'].to_numpy(dtype=float)
+        return cls(
+            holdings_df['ticker'],
+            qty,
+            holdings_df['cost_amount'].to_numpy(dtype=float) / qty,
+            holdings_df['Current Price'].to_numpy(dtype=float),
+            [fx.get(t, 1.0) for t in holdings_df['ticker']],
+            holdings_df['Sector'] if 'Sector' in holdings_df else ["Others"] * len(holdings_df),
+        )
+
+    def with_assets(self, tickers, prices, fx, sectors):
+        # add zero-quantity slots for tickers a scenario wants to buy
+        new = [t for t in tickers if t not in self.index]
+        if not new:
+            return self
+        return PortfolioState(
+            self.tickers + new,
+            np.concatenate([self.qty, np.zeros(len(new))]),
+            np.concatenate([self.avg_cost, np.zeros(len(new))]),
+            np.concatenate([self.price, [prices[t] for t in new]]),
+            np.concatenate([self.fx, [fx.get(t, 1.0) for t in new]]),
+            self.sectors + [sectors.get(t, "Others") for t in new],
+        )
+
+    def values(self):
+        return self.qty * self.price * self.fx
+
+
+def trades_to_matrix(state, scenarios):
+    # scenarios: list of trade lists; a trade is a dict with ticker, side
+    # (BUY/SELL) and either quantity or fraction (of the current holding),
+    # plus an optional execution price. Returns (delta qty, exec price), S x N.
+    # Several trades in one ticker execute at their quantity-weighted price;
+    # buying and selling the same ticker in one scenario is rejected, since a
+    # single net delta cannot carry that round trip's realized P&L.
+    delta = np.zeros((len(scenarios), len(state.tickers)))
+    notional = np.zeros_like(delta)
+    exec_price = np.tile(state.price, (len(scenarios), 1))
+    for s, trades in enumerate(scenarios):
+        sides = {}
+        for trade in trades:
+            i = state.index[trade['ticker']]
+            if sides.setdefault(i, trade['side']) != trade['side']:
+                raise ValueError(f"{trade['ticker']} is both bought and sold in one scenario.")
+            qty = trade.get('quantity')
+            if qty is None:
+                qty = state.qty[i] * trade.get('fraction', 0.0)
+            price = trade.get('price')
+            delta[s, i] += qty if trade['side'] == 'BUY' else -qty
+            notional[s, i] += qty * (state.price[i] if price is None else price)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        exec_price = np.where(delta != 0, notional / np.abs(delta), exec_price)
+    return delta, exec_price
+
+
+def evaluate(state, delta, exec_price=None):
+    # Apply S scenarios of quantity changes at once. Realized P&L uses the
+    # same average-cost rule as calculate_portfolio. Overselling marks the
+    # scenario infeasible instead of going short.
+    delta = np.atleast_2d(delta)
+    exec_price = np.tile(state.price, (len(delta), 1)) if exec_price is None else np.atleast_2d(exec_price)
+
+    new_qty = state.qty + delta
+    feasible = (new_qty >= -1e-9).all(axis=1)
+    new_qty = np.maximum(new_qty, 0.0)
+
+    sold = np.clip(-delta, 0.0, state.qty)
+    bought = np.clip(delta, 0.0, None)
+    realized = (sold * (exec_price - state.avg_cost) * state.fx).sum(axis=1)
+    cash_flow = ((sold - bought) * exec_price * state.fx).sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        held_after_sale = state.qty - sold
+        new_avg = np.where(new_qty > 0,
+                           (held_after_sale * state.avg_cost + bought * exec_price) / (held_after_sale + bought),
+                           0.0)
+
+    value = new_qty * state.price * state.fx
+    total = value.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weights = np.where(total[:, None] > 0, value / total[:, None], 0.0)
+
+    return {
+        "qty": new_qty,
+        "avg_cost": new_avg,
+        "value": value,
+        "total_value": total,
+        "weights": weights,
+        "sector_weights": weights @ state.sector_onehot,
+        "realized_pnl": realized,
+        "cash_flow": cash_flow,
+        "feasible": feasible,
+    }
+
+
+def what_if(state, trades):
+    # One scenario as tables for the UI.
+    delta, exec_price = trades_to_matrix(state, [trades])
+    result = evaluate(state, delta, exec_price)
+    before = state.values()
+    before_w = before / before.sum() if before.sum() > 0 else before
+
+    allocation = pd.DataFrame({
+        'ticker': state.tickers,
+        'Quantity': result['qty'][0],
+        'Market Value': result['value'][0],
+        'Weight Before %': before_w * 100,
+        'Weight After %': result['weights'][0] * 100,
+    })
+    sectors = pd.DataFrame({
+        'Sector': state.sector_names,
+        'Before %': (before_w @ state.sector_onehot) * 100,
+        'After %': result['sector_weights'][0] * 100,
+    })
+    summary = {
+        'realized_pnl': float(result['realized_pnl'][0]),
+        'cash_flow': float(result['cash_flow'][0]),
+        'total_value': float(result['total_value'][0]),
+        'feasible': bool(result['feasible'][0]),
+    }
+    return allocation, sectors, summary
+
+
+def _buy_only_targets(values, weights, budget):
+    # Water-filling per row: final value max(v_i, lam * w_i) with lam set so
+    # the portfolio grows by exactly `budget`. Nothing is sold, and new cash
+    # goes to the most underweight assets first. Rows of weights sum to 1.
+    if budget <= 0:
+        return np.tile(values, (len(weights), 1))
+    total = values.sum() + budget
+    lo, hi = np.zeros(len(weights)), np.full(len(weights), total)
+    for _ in range(100):
+        lam = (lo + hi) / 2
+        over = np.maximum(values, lam[:, None] * weights).sum(axis=1) > total
+        hi = np.where(over, lam, hi)
+        lo = np.where(over, lo, lam)
+    return np.maximum(values, lo[:, None] * weights)
+
+
+def rebalance_batch(state, target_matrix, cash=0.0, band=0.0, allow_sells=True, whole_units=None):
+    # Minimal-turnover trades for S candidate target-weight rows at once
+    # (each row any scale). With sells allowed the unique minimum leaves
+    # assets within `band` of target alone and moves the rest to their
+    # targets, rescaled so they share exactly what the untouched assets
+    # leave over; buy-only mode spends `cash` with water-filling. whole_units
+    # lists tickers traded in whole shares: buys round down and sells round
+    # up (at most the whole holding), so the trades never spend more than
+    # `cash` plus what the sells raise.
+    # Returns (qty, trade_value), both S x N, signed (+ = buy).
+    w = np.atleast_2d(np.asarray(target_matrix, dtype=float))
+    if (w.sum(axis=1) <= 0).any():
+        raise ValueError("Target weights must sum to more than zero.")
+    w = w / w.sum(axis=1, keepdims=True)
+
+    values = state.values()
+    total = values.sum() + cash
+    if allow_sells:
+        current_w = values / total if total > 0 else values
+        in_band = np.abs(current_w - w) <= band
+        out_w = np.where(in_band, 0.0, w)
+        out_sum = out_w.sum(axis=1, keepdims=True)
+        residual = total - np.where(in_band, values, 0.0).sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out_goal = np.where(out_sum > 0, out_w / out_sum * residual, 0.0)
+        goal = np.where(in_band, values, out_goal)
+    else:
+        goal = _buy_only_targets(values, w, cash)
+
+    unit_value = state.price * state.fx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        qty = np.where(unit_value > 0, (goal - values) / unit_value, 0.0)
+    if whole_units:
+        whole = np.isin(np.array(state.tickers, dtype=object), list(whole_units))
+        steps = np.floor(qty + 1e-9)  # so float noise like 2.9999999999 still counts as 3
+        rounded = np.where(qty > 0, steps, np.maximum(steps, -state.qty))
+        qty = np.where(whole, rounded, qty)
+    return qty, qty * unit_value
+
+
+def rebalance(state, targets, cash=0.0, band=0.0, allow_sells=True, whole_units=None):
+    # One target (dict ticker -> weight) through rebalance_batch, as a trade
+    # table plus turnover and the cash left after the trades.
+    tickers = list(state.tickers)
+    w = np.array([targets.get(t, 0.0) for t in tickers], dtype=float)
+    qty, trade_value = rebalance_batch(state, w, cash, band, allow_sells, whole_units)
+    qty, trade_value = qty[0], trade_value[0]
+
+    trades = pd.DataFrame({
+        'ticker': tickers,
+        'Side': np.where(qty > 0, 'BUY', 'SELL'),
+        'Quantity': np.abs(qty),
+        'Trade Value': np.abs(trade_value),
+        'Target %': w / w.sum() * 100,
+    })
+    trades = trades[trades['Quantity'] > 1e-9].reset_index(drop=True)
+    leftover_cash = cash - trade_value.sum()
+    return trades, float(np.abs(trade_value).sum()), float(leftover_cash)